@@ -0,0 +1,43 @@
+"""Facebook Ad Library scraping and ad mockup rendering toolkit.
+
+Public names are resolved lazily, so ``import adlayout`` stays cheap and
+Playwright or Pillow are only loaded by the pieces that use them.
+"""
+
+_EXPORTS = {
+    "AdLibraryScraper": "scraper",
+    "extract_ad": "scraper",
+    "take_screenshots": "screenshot",
+    "run_matrix": "render_matrix",
+    "RenderCache": "render_cache",
+    "ScreenshotPostProcessor": "postprocess",
+    "RunProfiler": "profiling",
+    "MediaDeriver": "media",
+    "DomainIndex": "domain_index",
+    "CrawlFrontier": "frontier",
+    "KeywordTagger": "tagging",
+    "TagIndex": "tagging",
+    "ShardStore": "coordinator",
+    "run_worker": "worker",
+    "normalize_url": "urls",
+    "registrable_domain": "urls",
+    "ScrapeConfig": "config",
+    "ScreenshotConfig": "config",
+    "MatrixConfig": "config",
+    "CoordinatorConfig": "config",
+    "MediaConfig": "config",
+    "search_url": "config",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
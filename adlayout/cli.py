@@ -0,0 +1,440 @@
+"""Command line entry point: ``python -m adlayout <command> ...``
+
+Each command imports what it needs inside its handler, so cheap commands
+(convert, dedupe, export, domains) never load Playwright or Pillow.
+"""
+import argparse
+import sys
+
+from .config import CoordinatorConfig, MatrixConfig, MediaConfig, ScrapeConfig, ScreenshotConfig, parse_scroll_windows, parse_viewport
+
+
+# ============= COMMANDS =============
+def cmd_scrape(args):
+    from .scraper import AdLibraryScraper
+
+    config = ScrapeConfig(
+        queries=args.query or ScrapeConfig().queries,
+        country=args.country,
+        urls=args.url or [],
+        target=args.target,
+        output_json=args.json,
+        output_csv=args.csv,
+        headless=args.headless,
+        memory_bounded=not args.no_memory_bounded,
+        max_scrolls=args.max_scrolls,
+        max_browser_mb=args.max_browser_mb,
+        max_process_mb=args.max_process_mb,
+        seen_file=args.seen_file,
+        delta=not args.no_delta,
+        registry_file=args.registry_file,
+        fan_out=args.fan_out,
+        fan_out_priority=args.fan_out_priority,
+        fan_out_workers=args.fan_out_workers,
+        fan_out_max_advertisers=args.fan_out_max_advertisers,
+        fan_out_per_advertiser=args.fan_out_per_advertiser,
+        fan_out_max_scrolls=args.fan_out_max_scrolls,
+        frontier_file=args.frontier_file,
+        domain_index_file=args.domain_index,
+        tagging=not args.no_tagging,
+        keywords_file=args.keywords,
+        tag_index_file=args.tag_index,
+        profile=args.profile or bool(args.trace_scrolls),
+        profile_dir=args.profile_dir,
+        trace_scrolls=parse_scroll_windows(args.trace_scrolls or ""),
+    )
+    AdLibraryScraper(config).run()
+    print(f"\n✨ Done! Your Facebook clone will automatically read from {config.output_json}")
+    return 0
+
+
+def cmd_coordinator(args):
+    from .coordinator import ShardStore, serve
+    from .store import load_ads
+
+    store = ShardStore(args.db, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts,
+                       fan_out=not args.no_fan_out)
+
+    countries = args.country or [ScrapeConfig().country]
+    added = sum(store.add(query, country) for query in args.query or [] for country in countries)
+    added += sum(store.add("", country, page_id) for page_id in args.page_id or [] for country in countries)
+    if added:
+        print(f"📦 Queued {added} new shards")
+
+    if args.action == "serve":
+        seeded = store.seed(load_ads(args.json))
+        if seeded:
+            print(f"📚 {seeded} ads from {args.json} added to the dedupe index")
+        serve(store, args.host, args.port)
+    elif args.action == "status":
+        status = store.status()
+        shards = ", ".join(f"{state}: {count}" for state, count in sorted(status["shards"].items())) or "none"
+        print(f"📦 Shards: {shards}")
+        print(f"👷 Active workers: {', '.join(status['workers']) or 'none'}")
+        print(f"📊 Ads: {status['ads']} collected, {status['unexported']} not yet exported")
+    elif args.action == "export":
+        new_ads = store.export(args.json, args.csv, args.domain_index, args.tag_index)
+        print(f"💾 Exported {len(new_ads)} new ads to {args.json}")
+
+    store.close()
+    return 0
+
+
+def cmd_worker(args):
+    from .worker import run_worker
+
+    config = ScrapeConfig(
+        target=args.target,
+        headless=args.headless,
+        memory_bounded=not args.no_memory_bounded,
+        max_scrolls=args.max_scrolls,
+        max_browser_mb=args.max_browser_mb,
+        max_process_mb=args.max_process_mb,
+        seen_file=args.seen_file,
+        fan_out_per_advertiser=args.per_advertiser,
+        keywords_file=args.keywords,
+    )
+    run_worker(args.coordinator, config, worker_id=args.id)
+    return 0
+
+
+def cmd_screenshot(args):
+    from .screenshot import take_screenshots
+    from .store import load_ads
+
+    ads = load_ads(args.ads)
+    if not ads:
+        print(f"❌ No ads in {args.ads}. Exiting.")
+        return 1
+
+    config = ScreenshotConfig(
+        output_dir=args.out,
+        viewport=parse_viewport(args.viewport),
+        theme=args.theme,
+        headless=args.headless,
+        cache_dir=args.cache_dir,
+        formats=args.formats,
+        quality=args.quality,
+        thumbnail_width=args.thumbnail_width,
+        contact_sheets=not args.no_contact_sheets,
+        encode_workers=args.encode_workers,
+        profile=args.profile,
+        profile_dir=args.profile_dir,
+    )
+    if args.clone:
+        config.clone_path = args.clone
+
+    summary = take_screenshots(ads, config)
+    print(f"\n📸 Screenshots: {summary['images']} in {config.output_dir}/")
+    return 0
+
+
+def cmd_matrix(args):
+    from .render_matrix import run_matrix
+    from .store import load_ads
+
+    ads = load_ads(args.ads)
+    if not ads:
+        print(f"❌ No ads in {args.ads}. Exiting.")
+        return 1
+
+    config = MatrixConfig(
+        output_dir=args.out,
+        templates=args.templates,
+        themes=args.themes,
+        viewports=[parse_viewport(v) for v in args.viewports],
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+    )
+    stats, cached = run_matrix(ads, config)
+    print(f"\n📸 Rendered: {stats['rendered']} | ♻️  From cache: {cached} | ⚠️  Failed: {stats['failed']}")
+    return 1 if stats["failed"] else 0
+
+
+def cmd_media(args):
+    from .media import MediaDeriver
+    from .store import load_ads, save_ads
+
+    ads = load_ads(args.json)
+    if not ads:
+        print(f"❌ No ads in {args.json}. Exiting.")
+        return 1
+
+    deriver = MediaDeriver(
+        cache_dir=args.cache_dir,
+        output_dir=args.out,
+        widths=args.widths,
+        keyframes=args.keyframes,
+        quality=args.quality,
+        workers=args.workers,
+        base_url=args.base_url,
+    )
+    stats = deriver.run(ads)
+    save_ads(args.json, ads)
+    print(f"🖼️  Derived: {stats['derived']} | Reused: {stats['reused']} | Downloaded: {stats['downloaded']} | Failed: {stats['failed']}")
+    print(f"💾 Preview paths saved to {args.json}")
+    return 0
+
+
+def cmd_convert(args):
+    from .store import dedupe_ads, load_ads, read_rows_csv, rows_to_organizer, save_ads
+
+    rows = read_rows_csv(args.csv)
+    existing = load_ads(args.out) if args.append else []
+    ads, dropped = dedupe_ads(existing + rows_to_organizer(rows, start_index=len(existing)))
+    save_ads(args.out, ads)
+    print(f"📦 Converted {len(rows)} rows → {args.out} ({len(ads)} ads, {dropped} duplicates dropped)")
+    return 0
+
+
+def cmd_dedupe(args):
+    from .store import dedupe_ads, load_ads, save_ads
+
+    ads, dropped = dedupe_ads(load_ads(args.json))
+    out = args.out or args.json
+    save_ads(out, ads)
+    print(f"🧹 {dropped} duplicates removed, {len(ads)} ads saved to {out}")
+    return 0
+
+
+def cmd_export(args):
+    from .store import ORGANIZER_FIELDS, load_ads, write_rows_csv
+
+    ads = load_ads(args.json)
+    write_rows_csv(args.out, ads, fields=ORGANIZER_FIELDS)
+    print(f"📊 Exported {len(ads)} ads to {args.out}")
+    return 0
+
+
+def cmd_domains(args):
+    from .domain_index import DomainIndex
+    from .store import load_ads
+    from .urls import registrable_domain
+
+    index = DomainIndex(args.index)
+
+    if args.action == "build":
+        for path in args.terms:
+            added = index.add_all(load_ads(path))
+            print(f"📇 Indexed {added} ads from {path}")
+        index.save()
+        print(f"💾 {len(index.domains)} domains in {index.path}")
+        return 0
+
+    if args.action == "lookup":
+        matches = {}
+        for term in args.terms:
+            entry = index.lookup(term)
+            if entry:
+                matches[registrable_domain(term.strip().lower())] = entry
+    else:
+        matches = {}
+        for term in args.terms:
+            matches.update(index.search(term))
+
+    if not matches:
+        print("❌ No matching domains")
+        return 1
+    for domain, entry in sorted(matches.items()):
+        print(f"🌐 {domain.upper()}: {len(entry['ads'])} ads, {len(entry['advertisers'])} advertisers")
+        for advertiser in entry["advertisers"]:
+            print(f"   🏢 {advertiser}")
+    return 0
+
+
+def cmd_tags(args):
+    import json
+
+    from .store import load_ads, save_ads
+    from .tagging import KeywordTagger, TagIndex, load_keywords
+
+    if args.action == "dump":
+        print(json.dumps(load_keywords(args.keywords), indent=2, ensure_ascii=False))
+        return 0
+
+    index = TagIndex(args.index)
+
+    if args.action == "build":
+        tagger = KeywordTagger(load_keywords(args.keywords))
+        for path in args.terms:
+            ads = load_ads(path)
+            for ad in ads:
+                ad["tags"], ad["keywords"] = tagger.tag(ad.get("bodyText"), ad.get("descriptionText"))
+            save_ads(path, ads)
+            # Retagged ads lose whatever the old dictionary matched
+            index.remove_all(ad["id"] for ad in ads if ad.get("id"))
+            print(f"🏷️  Tagged {index.add_all(ads)} of {len(ads)} ads in {path}")
+        index.save()
+        print(f"💾 {len(index.tags)} tags, {len(index.keywords)} keywords in {index.path}")
+        return 0
+
+    found = False
+    for term in args.terms:
+        ad_ids = index.lookup(term)
+        if ad_ids:
+            found = True
+            print(f"🏷️  {term}: {len(ad_ids)} ads")
+            for ad_id in ad_ids:
+                print(f"   {ad_id}")
+    if not found:
+        print("❌ No matching tags or keywords")
+        return 1
+    return 0
+
+
+# ============= PARSER =============
+def build_parser():
+    scrape_defaults = ScrapeConfig()
+    shot_defaults = ScreenshotConfig()
+    matrix_defaults = MatrixConfig()
+
+    parser = argparse.ArgumentParser(
+        prog="adlayout",
+        description="Scrape Facebook Ad Library ads and render them into the feed clones.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrape = commands.add_parser("scrape", help="Sweep Ad Library searches for new ads")
+    scrape.add_argument("-q", "--query", action="append", help="Search keyword (repeatable, default: deposit)")
+    scrape.add_argument("--url", action="append", help="Explicit Ad Library URL (repeatable, overrides --query)")
+    scrape.add_argument("--country", default=scrape_defaults.country)
+    scrape.add_argument("-n", "--target", type=int, default=scrape_defaults.target, help="New ads per query")
+    scrape.add_argument("--json", default=scrape_defaults.output_json, help="Organizer JSON to merge into")
+    scrape.add_argument("--csv", default=scrape_defaults.output_csv, help="CSV of this run's new rows")
+    scrape.add_argument("--headless", action="store_true")
+    scrape.add_argument("--no-memory-bounded", action="store_true", help="Stop at --max-scrolls instead of recycling")
+    scrape.add_argument("--max-scrolls", type=int, default=scrape_defaults.max_scrolls)
+    scrape.add_argument("--max-browser-mb", type=int, default=scrape_defaults.max_browser_mb)
+    scrape.add_argument("--max-process-mb", type=int, default=scrape_defaults.max_process_mb)
+    scrape.add_argument("--seen-file", default=scrape_defaults.seen_file)
+    scrape.add_argument("--no-delta", action="store_true", help="Fully extract every card, even known unchanged ones")
+    scrape.add_argument("--registry-file", default=scrape_defaults.registry_file, help="First/last-seen registry for delta sweeps")
+    scrape.add_argument("--fan-out", action="store_true", help="Also crawl new advertisers' all-ads views")
+    scrape.add_argument("--fan-out-priority", choices=["most_ads", "newest"], default=scrape_defaults.fan_out_priority)
+    scrape.add_argument("--fan-out-workers", type=int, default=scrape_defaults.fan_out_workers)
+    scrape.add_argument("--fan-out-max-advertisers", type=int, default=scrape_defaults.fan_out_max_advertisers)
+    scrape.add_argument("--fan-out-per-advertiser", type=int, default=scrape_defaults.fan_out_per_advertiser)
+    scrape.add_argument("--fan-out-max-scrolls", type=int, default=scrape_defaults.fan_out_max_scrolls)
+    scrape.add_argument("--frontier-file", default=scrape_defaults.frontier_file)
+    scrape.add_argument("--domain-index", default=scrape_defaults.domain_index_file)
+    scrape.add_argument("--no-tagging", action="store_true", help="Skip keyword tagging of ad text")
+    scrape.add_argument("--keywords", default=scrape_defaults.keywords_file, help="Keyword dictionary JSON {tag: [terms]}")
+    scrape.add_argument("--tag-index", default=scrape_defaults.tag_index_file)
+    scrape.add_argument("--profile", action="store_true", help="Write a flame graph and per-phase report for this run")
+    scrape.add_argument("--profile-dir", default=scrape_defaults.profile_dir)
+    scrape.add_argument("--trace-scrolls", metavar="RANGES",
+                        help="Playwright-trace these scrolls, e.g. 10-15,40 (implies --profile)")
+    scrape.set_defaults(func=cmd_scrape)
+
+    coord_defaults = CoordinatorConfig()
+    coord = commands.add_parser("coordinator", help="Lease scrape shards to workers on several hosts")
+    coord.add_argument("action", choices=["serve", "add", "status", "export"])
+    coord.add_argument("-q", "--query", action="append", help="Queue a keyword shard (repeatable)")
+    coord.add_argument("--country", action="append", help="Countries for the queued shards (repeatable, default: PH)")
+    coord.add_argument("--page-id", action="append", help="Queue an advertiser shard (repeatable)")
+    coord.add_argument("--db", default=coord_defaults.db_path)
+    coord.add_argument("--host", default=coord_defaults.host)
+    coord.add_argument("--port", type=int, default=coord_defaults.port)
+    coord.add_argument("--lease-seconds", type=int, default=coord_defaults.lease_seconds)
+    coord.add_argument("--max-attempts", type=int, default=coord_defaults.max_attempts)
+    coord.add_argument("--no-fan-out", action="store_true", help="Don't queue advertiser shards from keyword results")
+    coord.add_argument("--json", default=scrape_defaults.output_json, help="Organizer JSON to seed from / export to")
+    coord.add_argument("--csv", default=scrape_defaults.output_csv)
+    coord.add_argument("--domain-index", default=scrape_defaults.domain_index_file)
+    coord.add_argument("--tag-index", default=scrape_defaults.tag_index_file)
+    coord.set_defaults(func=cmd_coordinator)
+
+    worker = commands.add_parser("worker", help="Scrape shards leased from a coordinator")
+    worker.add_argument("coordinator", help="Coordinator URL, e.g. http://10.0.0.5:8765")
+    worker.add_argument("--id", help="Worker name (default: host-pid)")
+    worker.add_argument("-n", "--target", type=int, default=scrape_defaults.target, help="New ads per keyword shard")
+    worker.add_argument("--per-advertiser", type=int, default=scrape_defaults.fan_out_per_advertiser)
+    worker.add_argument("--headless", action="store_true")
+    worker.add_argument("--no-memory-bounded", action="store_true")
+    worker.add_argument("--max-scrolls", type=int, default=scrape_defaults.max_scrolls)
+    worker.add_argument("--max-browser-mb", type=int, default=scrape_defaults.max_browser_mb)
+    worker.add_argument("--max-process-mb", type=int, default=scrape_defaults.max_process_mb)
+    worker.add_argument("--seen-file", default="worker_seen_cards.json")
+    worker.add_argument("--keywords", help="Keyword dictionary JSON {tag: [terms]} (default: built-in)")
+    worker.set_defaults(func=cmd_worker)
+
+    shot = commands.add_parser("screenshot", help="Screenshot ads in the Facebook clone")
+    shot.add_argument("--ads", default="facebook_ads_for_organizer.json", help="Organizer JSON to render")
+    shot.add_argument("--clone", help="Path to facebook-with-ads.html (default: the one in pages/)")
+    shot.add_argument("-o", "--out", default=shot_defaults.output_dir)
+    shot.add_argument("--viewport", default="1920x1080")
+    shot.add_argument("--theme", choices=["light", "dark"], default=shot_defaults.theme)
+    shot.add_argument("--headless", action="store_true")
+    shot.add_argument("--cache-dir", default=shot_defaults.cache_dir)
+    shot.add_argument("--formats", nargs="+", choices=["png", "webp", "jpeg"], default=shot_defaults.formats)
+    shot.add_argument("--quality", type=int, default=shot_defaults.quality)
+    shot.add_argument("--thumbnail-width", type=int, default=shot_defaults.thumbnail_width)
+    shot.add_argument("--no-contact-sheets", action="store_true")
+    shot.add_argument("--encode-workers", type=int, default=shot_defaults.encode_workers)
+    shot.add_argument("--profile", action="store_true", help="Write a flame graph and per-phase report for this run")
+    shot.add_argument("--profile-dir", default=shot_defaults.profile_dir)
+    shot.set_defaults(func=cmd_screenshot)
+
+    matrix = commands.add_parser("matrix", help="Render ads × templates × themes × viewports in one browser")
+    matrix.add_argument("--ads", default="facebook_ads_for_organizer.json")
+    matrix.add_argument("-o", "--out", default=matrix_defaults.output_dir)
+    matrix.add_argument("--templates", nargs="+", default=matrix_defaults.templates,
+                        choices=["facebook", "instagram_desktop", "instagram_mobile"])
+    matrix.add_argument("--themes", nargs="+", choices=["light", "dark"], default=matrix_defaults.themes)
+    matrix.add_argument("--viewports", nargs="+", default=["1920x1080", "390x844"])
+    matrix.add_argument("--workers", type=int, default=matrix_defaults.workers)
+    matrix.add_argument("--cache-dir", default=matrix_defaults.cache_dir)
+    matrix.set_defaults(func=cmd_matrix)
+
+    media_defaults = MediaConfig()
+    media = commands.add_parser("media", help="Build thumbnail ladders and video keyframes for an organizer JSON")
+    media.add_argument("json", help="Organizer JSON, updated in place with the preview paths")
+    media.add_argument("-o", "--out", default=media_defaults.output_dir)
+    media.add_argument("--cache-dir", default=media_defaults.cache_dir)
+    media.add_argument("--widths", type=int, nargs="+", default=media_defaults.widths)
+    media.add_argument("--keyframes", type=int, default=media_defaults.keyframes)
+    media.add_argument("--quality", type=int, default=media_defaults.quality)
+    media.add_argument("--workers", type=int, default=media_defaults.workers)
+    media.add_argument("--base-url", default=media_defaults.base_url,
+                       help="Reference previews as BASE_URL/<file> instead of file:// URIs")
+    media.set_defaults(func=cmd_media)
+
+    convert = commands.add_parser("convert", help="Convert a scraper CSV into organizer JSON")
+    convert.add_argument("csv")
+    convert.add_argument("-o", "--out", default="facebook_ads_for_organizer.json")
+    convert.add_argument("--append", action="store_true", help="Merge into the existing JSON instead of replacing it")
+    convert.set_defaults(func=cmd_convert)
+
+    dedupe = commands.add_parser("dedupe", help="Remove repeated ads from an organizer JSON")
+    dedupe.add_argument("json")
+    dedupe.add_argument("-o", "--out", help="Write here instead of in place")
+    dedupe.set_defaults(func=cmd_dedupe)
+
+    export = commands.add_parser("export", help="Export an organizer JSON as CSV")
+    export.add_argument("json")
+    export.add_argument("-o", "--out", default="ads_export.csv")
+    export.set_defaults(func=cmd_export)
+
+    domains = commands.add_parser("domains", help="Build or query the landing-domain index")
+    domains.add_argument("action", choices=["build", "lookup", "search"])
+    domains.add_argument("terms", nargs="+", help="JSON files (build), domains/URLs (lookup) or glob / /regex/ (search)")
+    domains.add_argument("--index", default=scrape_defaults.domain_index_file)
+    domains.set_defaults(func=cmd_domains)
+
+    tags = commands.add_parser("tags", help="Tag ads by keyword dictionary or query the tag index")
+    tags.add_argument("action", choices=["build", "lookup", "dump"])
+    tags.add_argument("terms", nargs="*", help="JSON files to (re)tag (build) or tags/keywords (lookup)")
+    tags.add_argument("--keywords", help="Keyword dictionary JSON {tag: [terms]} (default: built-in)")
+    tags.add_argument("--index", default=scrape_defaults.tag_index_file)
+    tags.set_defaults(func=cmd_tags)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Run settings for the scraper, screenshotter and render matrix.
+
+Kept free of heavy imports so the CLI can build its parser from these
+defaults without loading Playwright.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlencode
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PAGES_DIR = REPO_ROOT / "pages"
+
+AD_LIBRARY_URL = "https://www.facebook.com/ads/library/"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def search_url(query, country="PH"):
+    """Ad Library keyword search for active ads in one country"""
+    params = {
+        "active_status": "active",
+        "ad_type": "all",
+        "country": country,
+        "is_targeted_country": "false",
+        "media_type": "all",
+        "q": query,
+        "search_type": "keyword_unordered",
+    }
+    return f"{AD_LIBRARY_URL}?{urlencode(params)}"
+
+
+def parse_viewport(text):
+    """'1920x1080' -> {'width': 1920, 'height': 1080}"""
+    width, _, height = text.lower().partition("x")
+    return {"width": int(width), "height": int(height)}
+
+
+def parse_scroll_windows(text):
+    """'10-15,40' -> [(10, 16), (40, 41)]: inclusive scroll ranges as half-open windows"""
+    windows = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        start, _, end = part.partition("-")
+        windows.append((int(start), int(end or start) + 1))
+    return windows
+
+
+@dataclass
+class ScrapeConfig:
+    queries: list = field(default_factory=lambda: ["deposit"])
+    country: str = "PH"
+    urls: list = field(default_factory=list)  # Explicit Ad Library URLs, used as-is
+    target: int = 100  # New ads per query sweep
+    output_json: str = "ads_data.json"  # Simple filename that HTML will read
+    output_csv: str = "facebook_ads_full_media.csv"
+    headless: bool = False
+
+    # Memory-bounded scrolling: recycle the browser context when it grows too
+    # big and keep sweeping until the results run out instead of stopping at
+    # max_scrolls
+    memory_bounded: bool = True
+    max_scrolls: int = 50  # Only used when memory_bounded is off
+    max_browser_mb: int = 1500
+    max_process_mb: int = 500
+    memory_check_every: int = 5  # Scrolls between memory checks
+    seen_file: str = "seen_cards.json"  # Card IDs already processed, shared across sessions (without delta)
+
+    # Delta sweeps: probe each card's identity first and only extract new or
+    # changed ads; known ones just get their last_seen bumped in the registry
+    delta: bool = True
+    registry_file: str = "ad_registry.json"
+
+    # Advertiser fan-out (opt-in): after the keyword sweep, crawl each new
+    # advertiser's "all ads" view (view_all_page_id) in parallel browsers
+    fan_out: bool = False
+    fan_out_priority: str = "most_ads"  # "most_ads" or "newest"
+    fan_out_workers: int = 3
+    fan_out_max_advertisers: int = 20  # Advertisers crawled per run; the rest stay queued
+    fan_out_per_advertiser: int = 30  # Cap on new ads taken from one advertiser
+    fan_out_max_scrolls: int = 40  # Per advertiser, since delta sweeps can scroll known ads to the end
+    frontier_file: str = "crawl_frontier.json"
+
+    domain_index_file: str = "domain_index.json"  # Landing domain -> ads/advertisers
+
+    # Keyword tagging at extraction time (scam indicators in body text and
+    # link description); keywords_file replaces the built-in dictionary
+    tagging: bool = True
+    keywords_file: str = None  # JSON {tag: [terms]}
+    tag_index_file: str = "tag_index.json"  # Tag/keyword -> ad ids
+
+    # Opt-in profiling: sampled stacks and per-phase timings, plus Playwright
+    # traces of the trace_scrolls windows, in a per-run folder under profile_dir
+    profile: bool = False
+    profile_dir: str = "profiles"
+    trace_scrolls: list = field(default_factory=list)  # [(first_scroll, end_scroll), ...], end exclusive
+
+    def sweep_urls(self):
+        return self.urls or [search_url(query, self.country) for query in self.queries]
+
+
+@dataclass
+class ScreenshotConfig:
+    clone_path: str = str(PAGES_DIR / "facebook" / "facebook-with-ads.html")
+    output_dir: str = "ad_screenshots"
+    viewport: dict = field(default_factory=lambda: {'width': 1920, 'height': 1080})
+    theme: str = "light"  # "light" or "dark" (mirrors the clone's dark-mode toggle)
+    headless: bool = False
+
+    cache_dir: str = "render_cache"
+    cache_max_mb: int = 500
+    cache_max_age_days: int = 30
+
+    formats: list = field(default_factory=lambda: ["png"])  # Any of "png", "webp", "jpeg"
+    quality: int = 80  # WebP/JPEG quality
+    thumbnail_width: int = 320  # 0 disables thumbnails
+    contact_sheets: bool = True  # One thumbnail sheet per advertiser
+    encode_workers: int = None  # None = one per CPU
+
+    profile: bool = False  # Sampled stacks + per-phase timings under profile_dir
+    profile_dir: str = "profiles"
+
+
+@dataclass
+class MediaConfig:
+    cache_dir: str = "media_cache"  # Downloaded images/videos, keyed by URL path
+    output_dir: str = "media_previews"
+    widths: list = field(default_factory=lambda: [160, 320, 640])  # Thumbnail ladder
+    keyframes: int = 3  # Per video; 0 disables ffmpeg
+    quality: int = 80
+    workers: int = None  # Derivation processes, None = one per CPU
+    base_url: str = None  # Prefix for preview URLs when output_dir is served over HTTP (default: file:// URIs)
+
+
+@dataclass
+class CoordinatorConfig:
+    db_path: str = "coordinator.db"  # Shard queue and global ad index
+    host: str = "0.0.0.0"
+    port: int = 8765
+    lease_seconds: int = 120  # A shard goes back to the queue this long after its last heartbeat
+    max_attempts: int = 3  # Leases per shard before it is marked failed
+    fan_out: bool = True  # Queue an advertiser shard for each page_id a keyword shard finds
+
+
+@dataclass
+class MatrixConfig:
+    output_dir: str = "ad_mockups"
+    templates: list = field(default_factory=lambda: ["facebook", "instagram_desktop", "instagram_mobile"])
+    themes: list = field(default_factory=lambda: ["light", "dark"])
+    viewports: list = field(default_factory=lambda: [
+        {'width': 1920, 'height': 1080},
+        {'width': 390, 'height': 844},
+    ])
+    workers: int = 4  # Pages rendering in parallel inside the one browser
+
+    cache_dir: str = "render_cache"
+    cache_max_mb: int = 500
+    cache_max_age_days: int = 30
@@ -0,0 +1,334 @@
+"""Distributed scraping: an HTTP coordinator over SQLite that leases shards to workers.
+
+A shard is one Ad Library view, either a keyword search (query × country)
+or an advertiser's all-ads view (page_id × country). Workers on any number
+of hosts lease a shard, heartbeat while sweeping it and post the rows back.
+The coordinator merges them through one global signature index, so an ad
+reported by two workers is stored once. A lease that stops heartbeating
+expires and the shard goes back to the queue.
+
+Standard library only: the coordinator host doesn't need Playwright.
+"""
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from .config import search_url
+from .domain_index import DomainIndex
+from .frontier import advertiser_url
+from .store import create_ad_signature, load_ads, rows_to_organizer, save_ads, write_rows_csv
+from .tagging import TagIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id TEXT PRIMARY KEY,
+    query TEXT NOT NULL DEFAULT '',
+    country TEXT NOT NULL,
+    page_id TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT 'pending',  -- pending, leased, done, failed
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    collected INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS shards_state ON shards (state, lease_expires);
+
+-- Global dedupe index: one row per ad signature, whichever worker found it first
+CREATE TABLE IF NOT EXISTS ads (
+    signature TEXT PRIMARY KEY,
+    row TEXT,
+    shard TEXT,
+    worker TEXT,
+    received REAL,
+    exported INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class CoordinatorError(RuntimeError):
+    """The coordinator answered with an HTTP error; `status` is its code"""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def shard_id(query, country, page_id=""):
+    return f"{query}|{country}|{page_id}"
+
+
+def shard_url(shard):
+    if shard["page_id"]:
+        return advertiser_url(shard["page_id"], shard["country"])
+    return search_url(shard["query"], shard["country"])
+
+
+class ShardStore:
+    """SQLite-backed shard queue with leases, plus the global ad index"""
+
+    def __init__(self, path, lease_seconds=120, max_attempts=3, fan_out=True):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.fan_out = fan_out
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def add(self, query, country, page_id=""):
+        """Queue a shard; returns False if it was already known"""
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO shards (id, query, country, page_id, updated) VALUES (?, ?, ?, ?, ?)",
+                (shard_id(query, country, page_id), query, country, page_id, time.time()),
+            )
+        return cursor.rowcount > 0
+
+    def seed(self, ads):
+        """Mark ads already in the organizer JSON as known, so workers' copies count as duplicates"""
+        with self.lock, self.db:
+            cursor = self.db.executemany(
+                "INSERT OR IGNORE INTO ads (signature, exported) VALUES (?, 1)",
+                ((create_ad_signature(ad),) for ad in ads),
+            )
+        return cursor.rowcount
+
+    def _reclaim_expired(self, now):
+        self.db.execute(
+            "UPDATE shards SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+            " worker = NULL, error = 'lease expired', updated = ?"
+            " WHERE state = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now, now),
+        )
+
+    def lease(self, worker):
+        """Hand the next shard to a worker; keyword sweeps go before advertiser crawls"""
+        now = time.time()
+        with self.lock, self.db:
+            self._reclaim_expired(now)
+            row = self.db.execute(
+                "SELECT * FROM shards WHERE state = 'pending' ORDER BY page_id != '', attempts, rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE shards SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated = ?"
+                " WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"]),
+            )
+        shard = {key: row[key] for key in ("id", "query", "country", "page_id")}
+        shard["url"] = shard_url(shard)
+        shard["lease_seconds"] = self.lease_seconds
+        return shard
+
+    def heartbeat(self, worker, shard):
+        """Extend a lease; False means the shard was reassigned and the worker should let it go"""
+        now = time.time()
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "UPDATE shards SET lease_expires = ?, updated = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (now + self.lease_seconds, now, shard, worker),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, worker, shard, rows):
+        """Merge a worker's rows into the global index and close the shard; returns (new, duplicates)"""
+        now = time.time()
+        with self.lock, self.db:
+            new = 0
+            advertisers = {}
+            for row in rows:
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO ads (signature, row, shard, worker, received) VALUES (?, ?, ?, ?, ?)",
+                    (create_ad_signature(row), json.dumps(row, ensure_ascii=False), shard, worker, now),
+                )
+                new += cursor.rowcount
+                if row.get("page_id"):
+                    advertisers[row["page_id"]] = row.get("advertiser", "")
+
+            # Rows are merged even from a lease that expired (dedupe makes that
+            # safe), but only the current holder closes the shard
+            self.db.execute(
+                "UPDATE shards SET state = 'done', collected = collected + ?, error = NULL, updated = ?"
+                " WHERE id = ? AND worker = ? AND state = 'leased'",
+                (new, now, shard, worker),
+            )
+
+            # Advertisers found by a keyword sweep become their own shards
+            source = self.db.execute("SELECT country, page_id FROM shards WHERE id = ?", (shard,)).fetchone()
+            if self.fan_out and source and not source["page_id"]:
+                country = source["country"]
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO shards (id, country, page_id, updated) VALUES (?, ?, ?, ?)",
+                    ((shard_id("", country, page_id), country, page_id, now) for page_id in advertisers),
+                )
+        return new, len(rows) - new
+
+    def fail(self, worker, shard, error=""):
+        """Give a shard back after a worker-side error; it fails for good after max_attempts"""
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE shards SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+                " worker = NULL, error = ?, updated = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (self.max_attempts, error[:500], time.time(), shard, worker),
+            )
+
+    def status(self):
+        with self.lock, self.db:
+            self._reclaim_expired(time.time())
+            shards = dict(self.db.execute("SELECT state, COUNT(*) FROM shards GROUP BY state").fetchall())
+            workers = [r[0] for r in self.db.execute("SELECT DISTINCT worker FROM shards WHERE state = 'leased'")]
+            ads = self.db.execute("SELECT COUNT(*) FROM ads WHERE row IS NOT NULL").fetchone()[0]
+            unexported = self.db.execute("SELECT COUNT(*) FROM ads WHERE exported = 0").fetchone()[0]
+        return {"shards": shards, "workers": workers, "ads": ads, "unexported": unexported}
+
+    def remaining(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM shards WHERE state IN ('pending', 'leased')").fetchone()[0]
+
+    def export(self, output_json, output_csv, domain_index_file, tag_index_file=None):
+        """Append ads not yet exported to the organizer JSON, CSV and indexes; returns the new organizer ads"""
+        with self.lock:
+            pending = self.db.execute("SELECT signature, row FROM ads WHERE exported = 0 ORDER BY received").fetchall()
+        if not pending:
+            return []
+
+        existing_ads = load_ads(output_json)
+        known = {create_ad_signature(ad) for ad in existing_ads}
+        rows = [json.loads(r["row"]) for r in pending if r["signature"] not in known]
+
+        new_ads = rows_to_organizer(rows, start_index=len(existing_ads))
+        if rows:
+            write_rows_csv(output_csv, rows)
+            save_ads(output_json, existing_ads + new_ads)
+            domain_index = DomainIndex(domain_index_file)
+            domain_index.add_all(new_ads)
+            domain_index.save()
+            if tag_index_file:
+                tag_index = TagIndex(tag_index_file)
+                tag_index.add_all(new_ads)
+                tag_index.save()
+
+        with self.lock, self.db:
+            self.db.executemany("UPDATE ads SET exported = 1 WHERE signature = ?", ((r["signature"],) for r in pending))
+        return new_ads
+
+    def close(self):
+        self.db.close()
+
+
+# ============= HTTP =============
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """JSON API: GET /status, POST /lease, /heartbeat, /complete, /fail"""
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._reply(200, self.server.store.status())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        store = self.server.store
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            worker = body["worker"]
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {"error": "expected a JSON body with 'worker'"})
+            return
+
+        # Everything but /lease acts on a shard; a bad body gets a 400, not a dropped connection
+        if self.path in ("/heartbeat", "/complete", "/fail"):
+            if not isinstance(body.get("shard"), str):
+                self._reply(400, {"error": "expected 'shard' as a string"})
+                return
+            rows = body.get("rows", [])
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                self._reply(400, {"error": "expected 'rows' as a list of objects"})
+                return
+            if not isinstance(body.get("error", ""), str):
+                self._reply(400, {"error": "expected 'error' as a string"})
+                return
+
+        if self.path == "/lease":
+            shard = store.lease(worker)
+            self._reply(200, {"shard": shard, "remaining": store.remaining()})
+        elif self.path == "/heartbeat":
+            self._reply(200, {"ok": store.heartbeat(worker, body["shard"])})
+        elif self.path == "/complete":
+            new, duplicates = store.complete(worker, body["shard"], body.get("rows", []))
+            print(f"   📥 {worker}: {body['shard']} → +{new} ads ({duplicates} duplicates)")
+            self._reply(200, {"new": new, "duplicates": duplicates})
+        elif self.path == "/fail":
+            store.fail(worker, body["shard"], body.get("error", ""))
+            print(f"   ⚠️  {worker}: {body['shard']} failed: {body.get('error', '')[:80]}")
+            self._reply(200, {"ok": True})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(store, host="0.0.0.0", port=8765):
+    server = ThreadingHTTPServer((host, port), CoordinatorHandler)
+    server.store = store
+    print(f"🛰️  Coordinator listening on http://{host}:{port} ({store.path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class CoordinatorClient:
+    """Worker-side calls to the coordinator API"""
+
+    def __init__(self, base_url, worker, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.worker = worker
+        self.timeout = timeout
+
+    def _post(self, endpoint, **payload):
+        payload["worker"] = self.worker
+        request = Request(
+            f"{self.base_url}/{endpoint}",
+            data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except HTTPError as e:
+            raise CoordinatorError(f"Coordinator {endpoint} failed: {e.code} {e.read()[:200]!r}", e.code) from e
+
+    def lease(self):
+        """Returns (shard or None, shards still pending or leased)"""
+        reply = self._post("lease")
+        return reply["shard"], reply["remaining"]
+
+    def heartbeat(self, shard):
+        return self._post("heartbeat", shard=shard)["ok"]
+
+    def complete(self, shard, rows):
+        return self._post("complete", shard=shard, rows=rows)
+
+    def fail(self, shard, error):
+        self._post("fail", shard=shard, error=error)
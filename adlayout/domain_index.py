@@ -0,0 +1,98 @@
+import fnmatch
+import json
+import re
+
+from .store import atomic_write_json
+from .urls import hostname, normalize_url, registrable_domain
+
+INDEX_FILE = "domain_index.json"
+
+
+class DomainIndex:
+    """Persistent inverted index: landing domain -> ads and advertisers"""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.domains = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.domains = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.domains = {}
+
+    def save(self):
+        atomic_write_json(self.path, self.domains, indent=2, ensure_ascii=False)
+
+    def add(self, ad):
+        """Index one organizer-format ad by the registrable domain of its landing URL"""
+        url = ad.get("linkUrl") or ""
+        domain = registrable_domain(url)
+        if not domain:
+            return None
+
+        entry = self.domains.setdefault(domain, {"ads": [], "advertisers": {}, "hosts": [], "urls": []})
+        advertiser = ad.get("pageName") or ""
+        host = hostname(url)
+        landing = normalize_url(url)
+
+        # What each ad contributed, so remove() can take it back out
+        if ad.get("id"):
+            if ad["id"] not in entry["ads"]:
+                entry["ads"].append(ad["id"])
+            entry.setdefault("by_ad", {})[ad["id"]] = {
+                "advertiser": advertiser,
+                "pageId": ad.get("pageId") or "",
+                "host": host,
+                "url": landing,
+            }
+        self._merge(entry, advertiser, ad.get("pageId") or "", host, landing)
+        return domain
+
+    @staticmethod
+    def _merge(entry, advertiser, page_id, host, landing):
+        if advertiser:
+            entry["advertisers"].setdefault(advertiser, page_id)
+        if host and host not in entry["hosts"]:
+            entry["hosts"].append(host)
+        if landing and landing not in entry["urls"]:
+            entry["urls"].append(landing)
+
+    def add_all(self, ads):
+        return sum(1 for ad in ads if self.add(ad))
+
+    def remove(self, ad_id):
+        """Drop an ad from every domain, with the advertiser, host and URL only it contributed"""
+        for domain in list(self.domains):
+            entry = self.domains[domain]
+            if ad_id not in entry["ads"]:
+                continue
+            entry["ads"].remove(ad_id)
+            if not entry["ads"]:
+                del self.domains[domain]
+                continue
+
+            by_ad = entry.setdefault("by_ad", {})
+            by_ad.pop(ad_id, None)
+            # Ads indexed before by_ad existed contributed unknown fields, so those stay
+            if all(other in by_ad for other in entry["ads"]):
+                entry["advertisers"], entry["hosts"], entry["urls"] = {}, [], []
+                for other in entry["ads"]:
+                    fields = by_ad[other]
+                    self._merge(entry, fields["advertiser"], fields["pageId"], fields["host"], fields["url"])
+
+    def lookup(self, domain):
+        """Exact lookup; accepts any URL or host under the domain"""
+        return self.domains.get(registrable_domain(domain.strip().lower()))
+
+    def search(self, pattern):
+        """Glob (`*.pro`, `v389*`) or /regex/ over indexed domains"""
+        pattern = pattern.strip()
+        if len(pattern) > 1 and pattern.startswith("/") and pattern.endswith("/"):
+            regex = re.compile(pattern[1:-1], re.IGNORECASE)
+        else:
+            regex = re.compile(fnmatch.translate(pattern.lower()))
+        return {domain: entry for domain, entry in self.domains.items() if regex.match(domain)}
+
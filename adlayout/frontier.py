@@ -0,0 +1,97 @@
+import json
+import time
+from urllib.parse import urlencode
+
+from .config import AD_LIBRARY_URL
+from .store import atomic_write_json
+
+PRIORITIES = ("most_ads", "newest")
+
+
+def advertiser_url(page_id, country="PH"):
+    """Ad Library "all ads" view for one advertiser page"""
+    params = {
+        "active_status": "active",
+        "ad_type": "all",
+        "country": country,
+        "is_targeted_country": "false",
+        "media_type": "all",
+        "search_type": "page",
+        "view_all_page_id": page_id,
+    }
+    return f"{AD_LIBRARY_URL}?{urlencode(params)}"
+
+
+class CrawlFrontier:
+    """Persistent queue of advertiser pages waiting for a fan-out crawl"""
+
+    def __init__(self, path, recrawl_days=7):
+        self.path = path
+        self.recrawl_days = recrawl_days
+        self.pending = {}
+        self.crawled = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.pending = data.get("pending", {})
+        self.crawled = data.get("crawled", {})
+
+    def save(self):
+        atomic_write_json(self.path, {"pending": self.pending, "crawled": self.crawled}, indent=2, ensure_ascii=False)
+
+    def _recently_crawled(self, page_id):
+        entry = self.crawled.get(page_id)
+        if not entry:
+            return False
+        return time.time() - entry["crawled_at"] < self.recrawl_days * 86400
+
+    def add(self, page_id, advertiser=""):
+        """Record one sighting of an advertiser; returns True if it was newly queued"""
+        if not page_id or self._recently_crawled(page_id):
+            return False
+        entry = self.pending.get(page_id)
+        if entry:
+            entry["ads_seen"] += 1
+            return False
+        self.pending[page_id] = {
+            "advertiser": advertiser,
+            "ads_seen": 1,
+            "first_seen": time.time(),
+        }
+        return True
+
+    def pop_batch(self, limit, priority="most_ads"):
+        """Take the highest-priority pending advertisers off the queue"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {PRIORITIES}")
+        if priority == "most_ads":
+            key = lambda item: (-item[1]["ads_seen"], -item[1]["first_seen"])
+        else:
+            key = lambda item: -item[1]["first_seen"]
+
+        batch = sorted(self.pending.items(), key=key)[:limit]
+        for page_id, _ in batch:
+            del self.pending[page_id]
+        return [dict(entry, page_id=page_id) for page_id, entry in batch]
+
+    def requeue(self, entry, max_failures=3):
+        """Put a batch entry whose crawl failed back in the queue; gives up after max_failures"""
+        entry = dict(entry)
+        page_id = entry.pop("page_id")
+        entry["failures"] = entry.get("failures", 0) + 1
+        if entry["failures"] >= max_failures:
+            self.mark_crawled(page_id, 0)
+            return False
+        self.pending[page_id] = entry
+        return True
+
+    def mark_crawled(self, page_id, ads_collected):
+        self.crawled[page_id] = {
+            "crawled_at": time.time(),
+            "ads_collected": ads_collected,
+        }
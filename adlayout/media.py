@@ -0,0 +1,297 @@
+"""Media derivation: lightweight previews for ad images and videos.
+
+Ad media is downloaded once into a local cache, keyed by the URL path
+because Facebook CDN query strings are re-signed on every scrape. The cached
+files then go through a process pool that builds:
+
+- a thumbnail ladder (JPEG at a few widths) for images and video posters
+- representative frames for videos (via ffmpeg), spread evenly over the
+  video, the most detailed of which becomes the poster when the ad has none
+
+The resulting paths are written back into each ad (``posterUrl``,
+``thumbnailUrls``, ``keyframeUrls``, ``mediaWidth``), so the clones can show a
+small still instead of loading the whole video. Pillow and ffmpeg are
+optional; whatever is missing is skipped and reported.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from .config import USER_AGENT
+from .store import atomic_write_json
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe")
+
+MEDIA_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".mp4", ".webm", ".mov"}
+
+# Fields apply() writes onto an ad; stale once the ad's media changes
+PREVIEW_FIELDS = ("posterUrl", "thumbnailUrls", "keyframeUrls", "mediaWidth")
+
+
+def media_key(url):
+    """Cache key for a media URL: its path, without the expiring signature params"""
+    parts = urlsplit(url)
+    return hashlib.sha1(f"{parts.netloc}{parts.path}".encode("utf-8")).hexdigest()[:20]
+
+
+# ============= WORKER FUNCTIONS =============
+# Run inside the process pool: module level, plain picklable arguments.
+
+def image_ladder(src_path, out_dir, key, widths, quality):
+    """Resize one image to each ladder width (never upscaling); returns its width and the rungs"""
+    from PIL import Image
+
+    with Image.open(src_path) as image:
+        image.seek(0)  # First frame of animated GIFs
+        image = image.convert("RGB")
+    thumbnails = {}
+    for width in sorted(widths):
+        if width >= image.width and thumbnails:
+            break
+        rung = image.copy()
+        rung.thumbnail((width, width * 10))
+        path = os.path.join(out_dir, f"{key}_{rung.width}.jpg")
+        rung.save(path, "JPEG", quality=quality, optimize=True, progressive=True)
+        thumbnails[str(rung.width)] = path
+    return {"width": image.width, "thumbnails": thumbnails}
+
+
+def video_duration(src_path):
+    """Length of a video in seconds (ffprobe), or None if unknown"""
+    if not FFPROBE:
+        return None
+    result = subprocess.run(
+        [FFPROBE, "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", src_path],
+        capture_output=True, text=True, check=True, timeout=60,
+    )
+    try:
+        return float(result.stdout.strip()) or None
+    except ValueError:
+        return None
+
+
+def video_keyframes(src_path, out_dir, key, count, quality):
+    """Grab `count` frames spread evenly across the video; the most detailed comes first"""
+    jpeg_q = str(max(2, (100 - quality) // 10))
+    duration = video_duration(src_path)
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        if duration:
+            # Seeking before -i jumps straight to the nearest keyframe, so each
+            # frame costs one short decode however long the video is
+            for i in range(count):
+                subprocess.run(
+                    [FFMPEG, "-v", "error", "-ss", f"{duration * (i + 0.5) / count:.3f}", "-i", src_path,
+                     "-frames:v", "1", "-q:v", jpeg_q, os.path.join(tmp, f"kf{i + 1:03d}.jpg")],
+                    check=True,
+                    timeout=60,
+                )
+        else:
+            # Unknown length: decode only the keyframes, over the whole stream
+            subprocess.run(
+                [FFMPEG, "-v", "error", "-skip_frame", "nokey", "-i", src_path,
+                 "-vsync", "vfr", "-q:v", jpeg_q, os.path.join(tmp, "kf%03d.jpg")],
+                check=True,
+                timeout=120,
+            )
+        frames = sorted(Path(tmp).glob("kf*.jpg"))
+        if not frames:
+            return []
+        step = max(1, len(frames) // count)
+        chosen = frames[::step][:count]
+
+        # JPEG size tracks detail, so this skips black and fade-in frames
+        chosen.sort(key=lambda path: path.stat().st_size, reverse=True)
+        kept = []
+        for i, frame in enumerate(chosen):
+            path = os.path.join(out_dir, f"{key}_kf{i + 1:02d}.jpg")
+            os.replace(frame, path)
+            kept.append(path)
+        return kept
+
+
+def derive_media(kind, src_path, poster_path, out_dir, key, widths, keyframes, quality):
+    """All previews for one media file; ``poster_path`` is the ad's own poster, if cached"""
+    result = {"key": key}
+    base = src_path if kind == "image" else poster_path
+
+    if kind == "video" and FFMPEG and keyframes:
+        try:
+            result["keyframes"] = video_keyframes(src_path, out_dir, key, keyframes, quality)
+        except (subprocess.SubprocessError, OSError) as e:
+            result["error"] = f"ffmpeg: {e}"
+        if not base and result.get("keyframes"):
+            base = result["keyframes"][0]
+
+    if base and HAS_PILLOW:
+        result.update(image_ladder(base, out_dir, key, widths, quality))
+    return result
+
+
+# ============= PIPELINE =============
+class MediaDeriver:
+    """Fetches ad media into the cache and derives previews in a process pool"""
+
+    def __init__(self, cache_dir="media_cache", output_dir="media_previews", widths=(160, 320, 640),
+                 keyframes=3, quality=80, workers=None, download_workers=8, base_url=None):
+        self.cache_dir = Path(cache_dir)
+        self.output_dir = Path(output_dir)
+        self.widths = list(widths)
+        self.keyframes = keyframes
+        self.quality = quality
+        self.workers = workers
+        self.download_workers = download_workers
+        self.base_url = base_url
+        self.index_path = self.output_dir / "index.json"
+        self.index = self._load_index()
+        self.stats = {"downloaded": 0, "cached": 0, "derived": 0, "reused": 0, "failed": 0}
+        self.lock = threading.Lock()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    # ============= CACHE =============
+    def cache_path(self, url):
+        suffix = PurePosixPath(urlsplit(url).path).suffix.lower()
+        return self.cache_dir / f"{media_key(url)}{suffix if suffix in MEDIA_SUFFIXES else ''}"
+
+    def fetch(self, url):
+        """Path of the cached copy of `url`, downloading it if needed; None on failure"""
+        path = self.cache_path(url)
+        if path.exists():
+            self._count("cached")
+            return path
+        tmp_path = path.with_name(path.name + ".part")
+        try:
+            request = Request(url, headers={"User-Agent": USER_AGENT})
+            with urlopen(request, timeout=60) as response, open(tmp_path, "wb") as f:
+                shutil.copyfileobj(response, f)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  Download failed ({e}): {url[:80]}")
+            tmp_path.unlink(missing_ok=True)
+            self._count("failed")
+            return None
+        self._count("downloaded")
+        return path
+
+    def _count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def to_url(self, path):
+        """How a preview is referenced from the ad: file URI, or under base_url when served"""
+        if not path:
+            return ""
+        path = Path(path)
+        if self.base_url:
+            return f"{self.base_url.rstrip('/')}/{path.resolve().relative_to(self.output_dir.resolve()).as_posix()}"
+        return path.resolve().as_uri()
+
+    # ============= RUN =============
+    def _jobs(self, ads):
+        """One job per distinct media file: (kind, media_url, poster_url), grouped by key"""
+        jobs = {}
+        for ad in ads:
+            if ad.get("videoUrl"):
+                kind, url, poster = "video", ad["videoUrl"], ad.get("imageUrl") or ""
+            elif ad.get("imageUrl"):
+                kind, url, poster = "image", ad["imageUrl"], ""
+            else:
+                continue
+            jobs.setdefault(media_key(url), (kind, url, poster))
+        return jobs
+
+    def run(self, ads):
+        """Derive previews for every ad with media and record them on the ads; returns stats"""
+        if not HAS_PILLOW:
+            print("⚠️  Pillow not installed - thumbnail ladders skipped (pip install pillow)")
+        if not FFMPEG:
+            print("⚠️  ffmpeg not found - video keyframes skipped")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        jobs = self._jobs(ads)
+        todo = {key: job for key, job in jobs.items() if key not in self.index}
+        self.stats["reused"] = len(jobs) - len(todo)
+        print(f"🎞️  Media: {len(jobs)} files, {len(todo)} to derive ({self.stats['reused']} already done)")
+
+        if todo:
+            # Downloads are I/O bound and stay on threads; each finished file
+            # goes straight into the process pool
+            with ThreadPoolExecutor(self.download_workers) as downloads, \
+                    ProcessPoolExecutor(max_workers=self.workers) as pool:
+                def fetch_job(key, job):
+                    kind, url, poster = job
+                    src_path = self.fetch(url)
+                    poster_path = self.fetch(poster) if poster else None
+                    if src_path is None:
+                        return None
+                    return pool.submit(
+                        derive_media, kind, str(src_path), str(poster_path) if poster_path else None,
+                        str(self.output_dir), key, self.widths, self.keyframes, self.quality,
+                    )
+
+                pending = [downloads.submit(fetch_job, key, job) for key, job in todo.items()]
+                for fetched in pending:
+                    # e.g. http.client.IncompleteRead: one bad download mustn't lose the index
+                    try:
+                        derived = fetched.result()
+                    except Exception as e:
+                        print(f"   ⚠️  Download failed: {e}")
+                        self._count("failed")
+                        continue
+                    if derived is None:
+                        continue
+                    try:
+                        result = derived.result()
+                    except Exception as e:
+                        print(f"   ⚠️  Derivation failed: {e}")
+                        self.stats["failed"] += 1
+                        continue
+                    if result.get("error"):
+                        print(f"   ⚠️  {result['error']}")
+                    # Nothing derived (e.g. no Pillow yet) stays out of the index so a later run retries it
+                    if result.get("thumbnails") or result.get("keyframes"):
+                        self.index[result.pop("key")] = result
+                        self.stats["derived"] += 1
+
+            atomic_write_json(self.index_path, self.index, indent=2)
+
+        for ad in ads:
+            self.apply(ad)
+        return self.stats
+
+    def apply(self, ad):
+        """Write the derived preview paths for an ad's media into the ad"""
+        url = ad.get("videoUrl") or ad.get("imageUrl")
+        entry = self.index.get(media_key(url)) if url else None
+        if not entry:
+            return False
+
+        thumbnails = entry.get("thumbnails", {})
+        ad["thumbnailUrls"] = {width: self.to_url(path) for width, path in thumbnails.items()}
+        ad["mediaWidth"] = entry.get("width", 0)
+        if ad.get("videoUrl"):
+            ad["keyframeUrls"] = [self.to_url(path) for path in entry.get("keyframes", [])]
+            # Largest rung is plenty for a feed-width poster and far lighter than the video
+            if thumbnails:
+                ad["posterUrl"] = self.to_url(thumbnails[max(thumbnails, key=int)])
+            elif ad["keyframeUrls"]:
+                ad["posterUrl"] = ad["keyframeUrls"][0]
+        return True
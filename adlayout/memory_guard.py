@@ -0,0 +1,133 @@
+import json
+import os
+
+from .store import atomic_write_json
+
+try:
+    import psutil
+except ImportError:  # Optional: falls back to /proc
+    psutil = None
+
+MB = 1024 * 1024
+
+
+def process_rss_mb():
+    """Resident memory of this Python process"""
+    if psutil:
+        return psutil.Process().memory_info().rss / MB
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+def proc_descendants(pid):
+    """PIDs of every process below `pid`, read from /proc; None where there is no /proc"""
+    children = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name is parenthesised and may contain spaces
+                ppid = int(f.read().rpartition(")")[2].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    found = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def browser_rss_mb(page=None):
+    """Resident memory of the browser processes; None if it can't be measured here"""
+    # Chromium runs under the Playwright driver, which is our child process
+    if psutil:
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / MB
+
+    pids = proc_descendants(os.getpid())
+    if pids is None:
+        return None
+    total = 0
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+    return total / MB
+
+
+class MemoryMonitor:
+    """Decides when a long infinite-scroll session should be recycled"""
+
+    def __init__(self, max_browser_mb=1500, max_process_mb=500):
+        self.max_browser_mb = max_browser_mb
+        self.max_process_mb = max_process_mb
+        self.last_browser_mb = 0.0
+        self.last_process_mb = 0.0
+        self.last_browsers = 1
+        if browser_rss_mb() is None:
+            print("⚠️  Can't measure browser memory here (pip install psutil); only the Python limit applies")
+
+    def over_limit(self, page, browsers=1):
+        """`browsers` running at once (fan-out workers) each get max_browser_mb:
+        the measurement covers every browser below this process"""
+        self.last_browsers = browsers
+        self.last_browser_mb = browser_rss_mb(page) or 0.0
+        self.last_process_mb = process_rss_mb()
+        return (
+            self.last_browser_mb > self.max_browser_mb * browsers
+            or self.last_process_mb > self.max_process_mb
+        )
+
+    def describe(self):
+        browsers = f" across {self.last_browsers} browsers" if self.last_browsers > 1 else ""
+        return f"browser {self.last_browser_mb:.0f} MB{browsers}, python {self.last_process_mb:.0f} MB"
+
+
+def load_seen_ids(path):
+    """Load card IDs processed by earlier sessions"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return set(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+
+
+def save_seen_ids(path, seen_ids):
+    """Persist processed card IDs so a recycled or restarted sweep can skip them"""
+    atomic_write_json(path, sorted(seen_ids))
+
+
+def fast_forward(page, target_y, settle_ms=1500, max_stalls=3):
+    """Scroll a fresh page back to a previous depth without extracting anything"""
+    stalls = 0
+    last_height = 0
+    while True:
+        height = page.evaluate("document.body.scrollHeight")
+        if height >= target_y or stalls >= max_stalls:
+            break
+        stalls = stalls + 1 if height <= last_height else 0
+        last_height = height
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        page.wait_for_timeout(settle_ms)
+    page.evaluate(f"window.scrollTo(0, {int(target_y)})")
+    page.wait_for_timeout(settle_ms)
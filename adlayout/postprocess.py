@@ -0,0 +1,250 @@
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .store import safe_filename
+
+# Pillow is only needed for encoding; without it screenshots are saved as-is
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+FORMAT_EXTENSIONS = {"png": "png", "webp": "webp", "jpeg": "jpg", "jpg": "jpg"}
+
+
+# ============= WORKER FUNCTIONS =============
+# These run inside the process pool, so they stay at module level and only
+# take plain picklable arguments.
+
+def encode_screenshot(png_bytes, out_dir, stem, formats, quality, thumb_dir, thumb_width):
+    """Encode one raw screenshot into every requested format plus a thumbnail"""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png_bytes))
+    image.load()
+    files = []
+
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{stem}.{FORMAT_EXTENSIONS[fmt]}")
+        if fmt == "png":
+            image.save(path, "PNG", optimize=True)
+        elif fmt == "webp":
+            image.save(path, "WEBP", quality=quality, method=6)
+        else:
+            image.convert("RGB").save(path, "JPEG", quality=quality, optimize=True, progressive=True)
+        files.append(path)
+
+    thumbnail = ""
+    if thumb_width:
+        thumb = image.convert("RGB")
+        thumb.thumbnail((thumb_width, thumb_width * 10))
+        thumbnail = os.path.join(thumb_dir, f"{stem}.jpg")
+        thumb.save(thumbnail, "JPEG", quality=quality, optimize=True)
+
+    return {
+        "stem": stem,
+        "files": files,
+        "thumbnail": thumbnail,
+        "bytes_in": len(png_bytes),
+        "bytes_out": sum(os.path.getsize(path) for path in files),
+    }
+
+
+def build_contact_sheet(thumb_paths, out_path, columns, quality):
+    """Tile thumbnails into one sheet, top-aligned in rows"""
+    from PIL import Image
+
+    thumbs = [Image.open(path) for path in thumb_paths]
+    cell_w = max(t.width for t in thumbs)
+    cell_h = max(t.height for t in thumbs)
+    rows = (len(thumbs) + columns - 1) // columns
+    gap = 8
+
+    sheet = Image.new(
+        "RGB",
+        (columns * cell_w + (columns + 1) * gap, rows * cell_h + (rows + 1) * gap),
+        "white",
+    )
+    for i, thumb in enumerate(thumbs):
+        col, row = i % columns, i // columns
+        sheet.paste(thumb, (gap + col * (cell_w + gap), gap + row * (cell_h + gap)))
+
+    sheet.save(out_path, "JPEG", quality=quality, optimize=True)
+    return out_path
+
+
+# ============= PIPELINE =============
+class ScreenshotPostProcessor:
+    """Encodes screenshot bytes in a process pool while capture keeps going"""
+
+    def __init__(self, output_dir, formats=("png",), quality=80, thumbnail_width=320,
+                 contact_sheets=False, contact_sheet_columns=4, workers=None):
+        unknown = [fmt for fmt in formats if fmt not in FORMAT_EXTENSIONS]
+        if unknown:
+            raise ValueError(f"Unsupported output format(s): {', '.join(unknown)}")
+
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.thumb_dir = self.output_dir / "thumbs"
+        self.sheet_dir = self.output_dir / "contact_sheets"
+        self.formats = list(formats)
+        self.quality = quality
+        self.thumbnail_width = thumbnail_width if HAS_PILLOW else 0
+        self.contact_sheets = contact_sheets and HAS_PILLOW
+        self.contact_sheet_columns = contact_sheet_columns
+        self.futures = []
+        self.results = []
+        self.reused = 0
+        # Names these encode settings, so cached encodes are only reused for the same ones
+        self.settings_key = hashlib.sha1(
+            json.dumps([self.formats, quality, self.thumbnail_width]).encode("utf-8")
+        ).hexdigest()[:12]
+
+        if self.thumbnail_width:
+            self.thumb_dir.mkdir(exist_ok=True)
+        if self.contact_sheets:
+            self.sheet_dir.mkdir(exist_ok=True)
+
+        self.pool = ProcessPoolExecutor(max_workers=workers) if HAS_PILLOW else None
+        if not HAS_PILLOW:
+            print("⚠️  Pillow not installed - saving raw PNGs (pip install pillow)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _encoded_files(self, encoded_dir):
+        """(cached outputs per format, cached thumbnail) inside an encoded-cache directory"""
+        files = [encoded_dir / f"out.{FORMAT_EXTENSIONS[fmt]}" for fmt in self.formats]
+        thumbnail = encoded_dir / "thumb.jpg" if self.thumbnail_width else None
+        return files, thumbnail
+
+    def restore(self, encoded_dir, stem, advertiser="", bytes_in=0):
+        """Copy earlier encodes of an unchanged screenshot into place; False if there are none"""
+        if self.pool is None or encoded_dir is None:
+            return False
+        cached, cached_thumb = self._encoded_files(Path(encoded_dir))
+        if not all(path.is_file() for path in cached) or (cached_thumb and not cached_thumb.is_file()):
+            return False
+
+        files = []
+        for fmt, src in zip(self.formats, cached):
+            path = self.output_dir / f"{stem}.{FORMAT_EXTENSIONS[fmt]}"
+            shutil.copyfile(src, path)
+            files.append(str(path))
+        thumbnail = ""
+        if cached_thumb:
+            thumbnail = str(self.thumb_dir / f"{stem}.jpg")
+            shutil.copyfile(cached_thumb, thumbnail)
+
+        self.results.append({
+            "stem": stem,
+            "files": files,
+            "thumbnail": thumbnail,
+            "bytes_in": bytes_in,
+            "bytes_out": sum(os.path.getsize(path) for path in files),
+            "advertiser": advertiser,
+        })
+        self.reused += 1
+        return True
+
+    def _store_encoded(self, result, encoded_dir):
+        """Keep a copy of fresh encodes for restore(); written aside, then renamed into place"""
+        encoded_dir = Path(encoded_dir)
+        if encoded_dir.exists():
+            return
+        tmp_dir = encoded_dir.with_name(encoded_dir.name + ".part")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        files, thumbnail = self._encoded_files(tmp_dir)
+        for src, dst in zip(result["files"], files):
+            shutil.copyfile(src, dst)
+        if thumbnail and result["thumbnail"]:
+            shutil.copyfile(result["thumbnail"], thumbnail)
+        os.replace(tmp_dir, encoded_dir)
+
+    def submit(self, png_bytes, stem, advertiser="", encoded_dir=None):
+        """Queue one screenshot for encoding; returns immediately
+
+        With `encoded_dir` the outputs are also kept there once encoded, so
+        the next run can restore() them instead of encoding again.
+        """
+        if self.pool is None:
+            path = self.output_dir / f"{stem}.png"
+            path.write_bytes(png_bytes)
+            self.results.append({
+                "stem": stem,
+                "files": [str(path)],
+                "thumbnail": "",
+                "bytes_in": len(png_bytes),
+                "bytes_out": len(png_bytes),
+                "advertiser": advertiser,
+            })
+            return
+
+        future = self.pool.submit(
+            encode_screenshot,
+            png_bytes,
+            str(self.output_dir),
+            stem,
+            self.formats,
+            self.quality,
+            str(self.thumb_dir),
+            self.thumbnail_width,
+        )
+        self.futures.append((future, advertiser, encoded_dir))
+
+    def close(self):
+        """Wait for pending encodes, build contact sheets and report totals"""
+        for future, advertiser, encoded_dir in self.futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"   ⚠️  Encoding failed: {str(e)}")
+                continue
+            result["advertiser"] = advertiser
+            self.results.append(result)
+            if encoded_dir is not None:
+                try:
+                    self._store_encoded(result, encoded_dir)
+                except OSError as e:
+                    print(f"   ⚠️  Could not cache encoded {result['stem']}: {str(e)}")
+        self.futures = []
+
+        sheets = []
+        if self.contact_sheets:
+            by_advertiser = defaultdict(list)
+            for result in self.results:
+                if result["thumbnail"]:
+                    by_advertiser[result["advertiser"] or "Unknown"].append(result["thumbnail"])
+
+            sheet_futures = []
+            for advertiser, thumbs in by_advertiser.items():
+                out_path = str(self.sheet_dir / f"{safe_filename(advertiser)}.jpg")
+                sheet_futures.append(self.pool.submit(
+                    build_contact_sheet, sorted(thumbs), out_path,
+                    self.contact_sheet_columns, self.quality,
+                ))
+            for future in sheet_futures:
+                try:
+                    sheets.append(future.result())
+                except Exception as e:
+                    print(f"   ⚠️  Contact sheet failed: {str(e)}")
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+        return {
+            "images": len(self.results),
+            "reused": self.reused,
+            "bytes_in": sum(r["bytes_in"] for r in self.results),
+            "bytes_out": sum(r["bytes_out"] for r in self.results),
+            "contact_sheets": sheets,
+        }
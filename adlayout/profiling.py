@@ -0,0 +1,267 @@
+"""Opt-in run profiling: a sampling profiler plus explicit phase timers.
+
+Samples every thread's stack at a fixed interval from a background thread
+(no tracing hooks, so the overhead stays low enough for production runs)
+and writes, into one directory per run:
+
+- ``profile.collapsed``: folded stacks for flamegraph.pl / speedscope
+- ``flamegraph.svg``: a self-contained flame graph
+- ``phases.txt`` / ``phases.json``: wall time per phase and where the
+  samples inside it went (Python, waiting on Playwright/the browser, or
+  idle in a sleep, join or lock wait)
+
+Sync Playwright parks the caller's frames in a greenlet while it waits on
+the driver, so samples taken then only show Playwright/asyncio frames.
+Phases are therefore tracked explicitly and prefixed onto every stack.
+"""
+import html
+import json
+import linecache
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+# Frames from these paths mean the thread is blocked on the Playwright driver
+# (IPC round-trip plus whatever the browser is doing)
+PLAYWRIGHT_MARKERS = ("playwright", "greenlet", "asyncio", "selectors")
+
+# Blocking waits in the threading module (Thread.join, Event/Condition.wait, Queue.get)
+IDLE_FUNCTIONS = {"wait", "join", "_wait_for_tstate_lock", "acquire"}
+# time.sleep runs in C, so it only shows up in the source line of the innermost Python frame
+SLEEP_CALL_RE = re.compile(r"\bsleep\(")
+
+
+def frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}"
+
+
+def classify(frames):
+    """'playwright' if the stack is waiting on the driver, 'idle' if it is blocked
+    in a sleep, join or lock wait, else 'python'"""
+    for frame in frames:
+        filename = frame.f_code.co_filename.replace("\\", "/")
+        if any(f"/{marker}" in filename for marker in PLAYWRIGHT_MARKERS):
+            return "playwright"
+    if frames:
+        innermost = frames[-1]
+        if innermost.f_globals.get("__name__") == "threading" and innermost.f_code.co_name in IDLE_FUNCTIONS:
+            return "idle"
+        if SLEEP_CALL_RE.search(linecache.getline(innermost.f_code.co_filename, innermost.f_lineno)):
+            return "idle"
+    return "python"
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every hook is a no-op"""
+
+    enabled = False
+    output_dir = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def write_report(self):
+        return None
+
+
+class RunProfiler:
+    """Sampling profiler with named phases, written next to a run's outputs"""
+
+    enabled = True
+
+    def __init__(self, output_dir, interval=0.01):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.stacks = Counter()
+        self.phase_samples = defaultdict(Counter)
+        self.phase_time = defaultdict(float)
+        self.phase_calls = Counter()
+        self._phases = defaultdict(list)  # thread id -> active phase stack
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = None
+        self.elapsed = 0.0
+        self.samples = 0
+
+    # ============= SAMPLING =============
+    def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.started = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="adlayout-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self.started
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(frame)
+                    frame = frame.f_back
+                frames.reverse()
+
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                phase_path = list(self._phases.get(thread_id, ()))
+                category = classify(frames)
+
+                stack = [names.get(thread_id, str(thread_id))]
+                stack += [f"[{name}]" for name in phase_path]
+                stack += [frame_label(f) for f in frames]
+                self.stacks[";".join(stack)] += 1
+
+                # A sample counts towards its phase and every enclosing one
+                if not phase_path:
+                    self.phase_samples["(no phase)"][category] += 1
+                for depth in range(1, len(phase_path) + 1):
+                    self.phase_samples["/".join(phase_path[:depth])][category] += 1
+                self.samples += 1
+
+    # ============= PHASES =============
+    @contextmanager
+    def phase(self, name):
+        stack = self._phases[threading.get_ident()]
+        stack.append(name)
+        key = "/".join(stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_time[key] += time.perf_counter() - started
+            self.phase_calls[key] += 1
+            stack.pop()
+
+    # ============= OUTPUT =============
+    def write_report(self):
+        """Write folded stacks, flame graph and phase report; returns the directory"""
+        self.stop()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(self.output_dir / "profile.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        (self.output_dir / "flamegraph.svg").write_text(render_flamegraph(self.stacks), encoding="utf-8")
+
+        report = {
+            "elapsed_s": round(self.elapsed, 3),
+            "samples": self.samples,
+            "interval_s": self.interval,
+            "phases": {
+                phase: {
+                    "wall_s": round(self.phase_time[phase], 3),
+                    "calls": self.phase_calls[phase],
+                    "samples": dict(self.phase_samples.get(phase, {})),
+                }
+                for phase in sorted(self.phase_time, key=self.phase_time.get, reverse=True)
+            },
+        }
+        with open(self.output_dir / "phases.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        lines = [
+            f"Run: {self.elapsed:.1f}s wall, {self.samples} samples every {self.interval * 1000:.0f} ms",
+            "",
+            f"{'phase':<40} {'wall s':>9} {'calls':>7} {'python':>8} {'playwright':>11} {'idle':>7}",
+        ]
+        for phase, entry in report["phases"].items():
+            samples = entry["samples"]
+            total = sum(samples.values()) or 1
+            lines.append(
+                f"{phase:<40} {entry['wall_s']:>9.2f} {entry['calls']:>7}"
+                f" {100 * samples.get('python', 0) / total:>7.0f}% {100 * samples.get('playwright', 0) / total:>10.0f}%"
+                f" {100 * samples.get('idle', 0) / total:>6.0f}%"
+            )
+        lines += [
+            "",
+            "python     = time spent running Python (extraction, parsing, bookkeeping)",
+            "playwright = time blocked on the driver: IPC plus browser work and waits;",
+            "             open any trace_*.zip with `playwright show-trace` for the browser side",
+            "idle       = blocked in time.sleep, Thread.join or a lock/queue wait (e.g. waiting on worker threads)",
+        ]
+        (self.output_dir / "phases.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        return self.output_dir
+
+
+def make_profiler(enabled, output_dir, interval=0.01):
+    return RunProfiler(output_dir, interval) if enabled else NullProfiler()
+
+
+def run_profile_dir(base_dir, kind):
+    return Path(base_dir) / f"{kind}_{time.strftime('%Y%m%d_%H%M%S')}"
+
+
+# ============= FLAME GRAPH =============
+def render_flamegraph(stacks, width=1200, row_height=17):
+    """Minimal flame graph SVG from folded stacks (hover a box for its name and count)"""
+    root = {"count": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = root
+        node["count"] += count
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"count": 0, "children": {}})
+            node["count"] += count
+
+    total = root["count"] or 1
+    rects = []
+    max_depth = 0
+
+    def layout(node, x, depth):
+        nonlocal max_depth
+        for name, child in sorted(node["children"].items()):
+            w = width * child["count"] / total
+            if w >= 0.5:
+                rects.append((name, child["count"], x, depth, w))
+                max_depth = max(max_depth, depth)
+                layout(child, x, depth + 1)
+            x += w
+
+    layout(root, 0.0, 0)
+    height = (max_depth + 1) * row_height + 30
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="4" y="14">{total} samples</text>',
+    ]
+    for name, count, x, depth, w in rects:
+        y = height - (depth + 1) * row_height
+        hue = 10 + zlib.crc32(name.split(":")[0].encode("utf-8")) % 50
+        label = html.escape(name)
+        parts.append(
+            f'<g><title>{label} ({count} samples, {100 * count / total:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" fill="hsl({hue},80%,60%)"/>'
+        )
+        max_chars = int(w / 7)
+        if max_chars >= 3:
+            text = label if len(name) <= max_chars else html.escape(name[:max_chars - 2]) + ".."
+            parts.append(f'<text x="{x + 2:.1f}" y="{y + row_height - 5}">{text}</text>')
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts)
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime
+
+from .store import atomic_write_json
+
+
+def now_iso():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class AdRegistry:
+    """Every card identity swept so far, with a content digest and first/last-seen times
+
+    Lets delta sweeps skip full extraction for ads that are known and
+    unchanged while still recording that they were seen again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.touched = set()  # Identities seen during this run
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+    def check(self, identity, fingerprint):
+        """'new', 'changed' or 'known' for a probed card"""
+        entry = self.entries.get(identity)
+        if entry is None:
+            return "new"
+        return "known" if entry["fingerprint"] == fingerprint else "changed"
+
+    def touch(self, identity, when=None):
+        self.entries[identity]["last_seen"] = when or now_iso()
+        self.touched.add(identity)
+
+    def record(self, identity, fingerprint, when=None):
+        """Store a probed card, keeping its original first_seen; returns the entry"""
+        when = when or now_iso()
+        entry = self.entries.setdefault(identity, {"first_seen": when})
+        entry["fingerprint"] = fingerprint
+        entry["last_seen"] = when
+        self.touched.add(identity)
+        return entry
+
+    def save(self):
+        atomic_write_json(self.path, self.entries, indent=1)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+from .store import atomic_write_json
+
+# Fields the clone template actually draws. `id` is left out on purpose: it
+# doesn't show, and ads converted from the CSV again get new ones. The
+# random `timestamp` is drawn, and saved ads (changed ones included) keep
+# theirs, so it is part of the key.
+RENDER_FIELDS = [
+    "pageName",
+    "timestamp",
+    "bodyText",
+    "headerText",
+    "descriptionText",
+    "captionText",
+    "ctaButtonText",
+    "linkUrl",
+    "imageUrl",
+    "videoUrl",
+    "profilePictureUrl",
+    "posterUrl",
+    "thumbnailUrls",
+    "isSponsored",
+    "isFakeAd",
+]
+
+SCRIPT_SRC_RE = re.compile(r'<script[^>]+src="([^"]+)"', re.IGNORECASE)
+LINK_TAG_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+HREF_RE = re.compile(r'href="([^"]+)"', re.IGNORECASE)
+
+
+def normalize_ad(ad):
+    """Reduce an organizer ad to the fields that change its rendering"""
+    normalized = {}
+    for field in RENDER_FIELDS:
+        value = ad.get(field)
+        if isinstance(value, bool):
+            normalized[field] = value
+        elif value is None or value != value:  # None or pandas NaN
+            normalized[field] = ""
+        else:
+            normalized[field] = " ".join(str(value).split())
+    return normalized
+
+
+def asset_refs(html):
+    """Script srcs and stylesheet hrefs referenced by a page, in document order"""
+    refs = SCRIPT_SRC_RE.findall(html)
+    for tag in LINK_TAG_RE.findall(html):
+        href = HREF_RE.search(tag)
+        if href and "stylesheet" in tag.lower():
+            refs.append(href.group(1))
+    return refs
+
+
+def template_digest(template_path):
+    """Hash the clone template plus every local script and stylesheet it loads"""
+    template_path = Path(template_path)
+    digest = hashlib.sha256()
+    html = template_path.read_bytes()
+    digest.update(html)
+
+    for src in asset_refs(html.decode("utf-8", errors="ignore")):
+        if src.startswith(("http://", "https://", "//")):
+            continue
+        asset_path = (template_path.parent / src).resolve()
+        digest.update(src.encode("utf-8"))
+        if asset_path.is_file():
+            digest.update(asset_path.read_bytes())
+
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """PNG cache for rendered ad cards, keyed by ad content and render setup"""
+
+    def __init__(self, cache_dir, template_hash, viewport, theme="light",
+                 max_bytes=500 * 1024 * 1024, max_age_days=30):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.template_hash = template_hash
+        self.viewport = viewport
+        self.theme = theme
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def key_for(self, ad):
+        """Digest of normalized ad fields, template, viewport and theme"""
+        payload = {
+            "ad": normalize_ad(ad),
+            "template": self.template_hash,
+            "viewport": [self.viewport["width"], self.viewport["height"]],
+            "theme": self.theme,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, ad):
+        """Return the cached PNG path for an ad, or None on a miss"""
+        key = self.key_for(ad)
+        entry = self.index.get(key)
+        if entry:
+            path = self.cache_dir / entry["file"]
+            if path.is_file():
+                entry["last_used"] = time.time()
+                self.hits += 1
+                return path
+            del self.index[key]
+        self.misses += 1
+        return None
+
+    def encoded_dir(self, key, variant):
+        """Where encoded copies of one cached render live; `variant` names the encode settings"""
+        return self.cache_dir / "encoded" / f"{key}_{variant}"
+
+    def put(self, ad, png_path):
+        """Copy a freshly rendered PNG into the cache"""
+        key = self.key_for(ad)
+        filename = f"{key}.png"
+        shutil.copyfile(png_path, self.cache_dir / filename)
+        self._record(key, filename, os.path.getsize(png_path))
+
+    def put_bytes(self, ad, png_bytes):
+        """Store an in-memory screenshot in the cache"""
+        key = self.key_for(ad)
+        filename = f"{key}.png"
+        (self.cache_dir / filename).write_bytes(png_bytes)
+        self._record(key, filename, len(png_bytes))
+
+    def _record(self, key, filename, size):
+        now = time.time()
+        self.index[key] = {
+            "file": filename,
+            "size": size,
+            "created": now,
+            "last_used": now,
+        }
+
+    def evict(self):
+        """Drop stale entries, then least recently used ones until under max_bytes"""
+        removed = 0
+        cutoff = time.time() - self.max_age_days * 86400
+        for key, entry in list(self.index.items()):
+            if entry["last_used"] < cutoff:
+                self._remove(key)
+                removed += 1
+
+        total = sum(entry["size"] for entry in self.index.values())
+        by_age = sorted(self.index.items(), key=lambda item: item[1]["last_used"])
+        for key, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            self._remove(key)
+            removed += 1
+
+        return removed
+
+    def _remove(self, key):
+        entry = self.index.pop(key)
+        try:
+            (self.cache_dir / entry["file"]).unlink()
+        except FileNotFoundError:
+            pass
+        for encoded in self.cache_dir.glob(f"encoded/{key}_*"):
+            shutil.rmtree(encoded, ignore_errors=True)
+
+    def save(self):
+        """Evict and persist the index"""
+        removed = self.evict()
+        atomic_write_json(self.index_path, self.index, indent=2)
+        return removed
@@ -0,0 +1,262 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from .config import PAGES_DIR, MatrixConfig
+from .render_cache import RenderCache, template_digest
+from .store import screenshot_stem
+
+# Static assets worth keeping in memory across every page of the batch
+ASSET_TYPES = {"script", "stylesheet", "image", "font"}
+
+# ============= TEMPLATES =============
+# Each template knows where its page lives, which element is the ad card,
+# which themes it really has, how to switch theme without a reload and how
+# to put one ad into the card.
+TEMPLATE_SPECS = {
+    "facebook": {
+        "path": PAGES_DIR / "facebook" / "facebook-with-ads.html",
+        "card": "#feed-container .ad-post",
+        "themes": ["light", "dark"],
+        "theme_js": """(dark) => {
+            document.body.classList.toggle("dark-mode", dark);
+            const toggle = document.getElementById("dark-mode-toggle");
+            if (toggle) toggle.checked = dark;
+            localStorage.setItem("dark-mode", dark);
+        }""",
+        "inject_js": """(ad) => {
+            renderer.clearFeed();
+            renderer.container.appendChild(renderer.renderAd(ad, {
+                showSponsoredLabel: true,
+                showAdControls: true,
+                profileImageUrl: ad.profilePictureUrl || null,
+                adImageUrl: ad.imageUrl || null,
+            }));
+        }""",
+    },
+    "instagram_desktop": {
+        "path": PAGES_DIR / "instagram" / "desktop" / "page.html",
+        "card": ".post-main",
+        "themes": ["light", "dark"],
+        "theme_js": """(dark) => {
+            document.body.classList.toggle("dark-mode", dark);
+            for (const id of ["white-color", "white-2color"]) {
+                const el = document.getElementById(id);
+                if (el) el.style.filter = dark ? "brightness(5)" : "none";
+            }
+        }""",
+        "inject_js": """(ad) => {
+            const post = document.querySelector(".post-main");
+            post.querySelector(".post-username").textContent = ad.pageName || "";
+            post.querySelector(".one-day").textContent = " . Sponsored";
+            if (ad.profilePictureUrl) post.querySelector(".post-image img").src = ad.profilePictureUrl;
+            post.querySelector(".post-main-image img").src = ad.imageUrl || "";
+            const title = post.querySelector(".title");
+            const name = document.createElement("span");
+            name.textContent = (ad.pageName || "") + " ";
+            title.replaceChildren(name, ad.bodyText || "");
+        }""",
+    },
+    "instagram_mobile": {
+        "path": PAGES_DIR / "instagram" / "mobile" / "lightInstagram.html",
+        "card": "article.post",
+        # No dark styles in this clone, so a dark render would only duplicate the light one
+        "themes": ["light"],
+        "theme_js": """(dark) => {
+            document.body.classList.toggle("dark-mode", dark);
+        }""",
+        "inject_js": """(ad) => {
+            const post = document.querySelector("article.post");
+            post.querySelector(".profile h2").textContent = ad.pageName || "";
+            post.querySelector(".profile h3").textContent = "Sponsored";
+            if (ad.profilePictureUrl) post.querySelector(".profile .avatar").src = ad.profilePictureUrl;
+            post.querySelector(".post-content img").src = ad.imageUrl || "";
+            const text = post.querySelector(".post-text");
+            const name = document.createElement("span");
+            name.textContent = (ad.pageName || "") + " ";
+            text.replaceChildren(name, ad.bodyText || "");
+        }""",
+    },
+}
+
+# Images that never settle (stalled CDN requests) give up after IMAGE_WAIT_MS
+IMAGE_WAIT_MS = 15000
+WAIT_FOR_IMAGES_JS = """(card, timeout) => Promise.race([
+    Promise.all(
+        [...card.querySelectorAll("img")]
+            .filter((img) => !img.complete)
+            // Listeners, not onerror=: the renderer's own onerror hides broken images
+            .map((img) => new Promise((resolve) => {
+                img.addEventListener("load", resolve, { once: true });
+                img.addEventListener("error", resolve, { once: true });
+            }))
+    ),
+    new Promise((resolve) => setTimeout(resolve, timeout)),
+])"""
+
+
+# ============= HELPER FUNCTIONS =============
+def variant_name(template, theme, viewport):
+    return f"{template}_{theme}_{viewport['width']}x{viewport['height']}"
+
+
+def build_jobs(ads, config):
+    """Expand ads × templates × themes × viewports, serving cache hits immediately
+
+    Themes a template doesn't have are skipped for that template.
+    """
+    jobs = []
+    caches = {}
+    cached = 0
+
+    for template in config.templates:
+        spec = TEMPLATE_SPECS[template]
+        template_hash = template_digest(spec["path"])
+        themes = [theme for theme in config.themes if theme in spec["themes"]]
+        for viewport in config.viewports:
+            for theme in themes:
+                variant = variant_name(template, theme, viewport)
+                out_dir = Path(config.output_dir) / variant
+                out_dir.mkdir(parents=True, exist_ok=True)
+                cache = RenderCache(
+                    Path(config.cache_dir) / variant,
+                    template_hash,
+                    viewport,
+                    theme=theme,
+                    max_bytes=config.cache_max_mb * 1024 * 1024,
+                    max_age_days=config.cache_max_age_days,
+                )
+                caches[variant] = cache
+
+                for idx, ad in enumerate(ads):
+                    filepath = out_dir / f"{screenshot_stem(idx, ad.get('pageName') or 'Unknown')}.png"
+                    hit = cache.get(ad)
+                    if hit:
+                        shutil.copyfile(hit, filepath)
+                        cached += 1
+                        continue
+                    jobs.append({
+                        "template": template,
+                        "theme": theme,
+                        "viewport": viewport,
+                        "ad": ad,
+                        "path": filepath,
+                        "cache": cache,
+                    })
+
+    return jobs, caches, cached
+
+
+async def serve_cached_asset(route, assets):
+    """Fetch each remote asset once per batch and replay it to every page"""
+    request = route.request
+    if request.resource_type not in ASSET_TYPES:
+        await route.continue_()
+        return
+
+    cached = assets.get(request.url)
+    if cached is None:
+        response = await route.fetch()
+        cached = (response.status, response.headers, await response.body())
+        if response.ok:
+            assets[request.url] = cached
+
+    status, headers, body = cached
+    await route.fulfill(status=status, headers=headers, body=body)
+
+
+async def open_template(context, template):
+    spec = TEMPLATE_SPECS[template]
+    page = await context.new_page()
+    await page.goto(spec["path"].as_uri(), wait_until="load")
+    return page
+
+
+async def render_worker(worker_id, context, queue, stats):
+    """Render queued jobs, keeping one warm page per template for this worker"""
+    pages = {}
+    state = {}
+
+    while True:
+        try:
+            job = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+
+        template = job["template"]
+        spec = TEMPLATE_SPECS[template]
+        try:
+            page = pages.get(template)
+            if page is None:
+                page = pages[template] = await open_template(context, template)
+                state[template] = {}
+
+            current = state[template]
+            if current.get("viewport") != job["viewport"]:
+                await page.set_viewport_size(job["viewport"])
+                current["viewport"] = job["viewport"]
+            if current.get("theme") != job["theme"]:
+                await page.evaluate(spec["theme_js"], job["theme"] == "dark")
+                current["theme"] = job["theme"]
+
+            await page.evaluate(spec["inject_js"], job["ad"])
+            card = await page.wait_for_selector(spec["card"], timeout=10000)
+            await card.scroll_into_view_if_needed()
+            await card.evaluate(WAIT_FOR_IMAGES_JS, IMAGE_WAIT_MS)
+
+            await card.screenshot(path=str(job["path"]))
+            job["cache"].put(job["ad"], job["path"])
+            stats["rendered"] += 1
+            print(f"   ✅ [w{worker_id}] {job['path'].parent.name}/{job['path'].name}")
+
+        except Exception as e:
+            stats["failed"] += 1
+            print(f"   ⚠️  [w{worker_id}] Error on {job['path'].name}: {str(e)}")
+
+    for page in pages.values():
+        await page.close()
+
+
+async def run_matrix_async(ads, config):
+    jobs, caches, cached = build_jobs(ads, config)
+    total = cached + len(jobs)
+    print(f"🧮 Matrix: {len(ads)} ads × {len(caches)} template/theme/viewport variants = {total}")
+    print(f"♻️  Cached: {cached} | 🆕 To render: {len(jobs)}\n")
+
+    stats = {"rendered": 0, "failed": 0}
+
+    if jobs:
+        # Grouping by template/viewport/theme keeps each worker's page switches rare
+        jobs.sort(key=lambda job: (job["template"], job["viewport"]["width"], job["theme"]))
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+
+        assets = {}
+        async with async_playwright() as p:
+            print("🔧 Launching browser...")
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context()
+            await context.route("http*://**/*", lambda route: serve_cached_asset(route, assets))
+
+            workers = min(config.workers, len(jobs))
+            print(f"📸 Rendering with {workers} workers...\n")
+            await asyncio.gather(*(
+                render_worker(i + 1, context, queue, stats) for i in range(workers)
+            ))
+
+            await browser.close()
+            print(f"\n📦 Assets fetched once and reused: {len(assets)}")
+
+    evicted = sum(cache.save() for cache in caches.values())
+    if evicted:
+        print(f"🧹 Evicted {evicted} cached renders")
+
+    return stats, cached
+
+
+def run_matrix(ads, config=None):
+    """Render every ad in every configured template/theme/viewport; returns (stats, cached)"""
+    return asyncio.run(run_matrix_async(ads, config or MatrixConfig()))
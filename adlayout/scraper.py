@@ -0,0 +1,775 @@
+"""Ad Library scraper: keyword sweeps, memory-bounded scrolling and advertiser fan-out.
+
+Usable in-process (``AdLibraryScraper(config).run()``) or through
+``python -m adlayout scrape``.
+"""
+import re
+import threading
+from datetime import datetime
+from queue import Empty, Queue
+
+from playwright.sync_api import sync_playwright
+
+from .config import USER_AGENT, ScrapeConfig
+from .domain_index import DomainIndex
+from .frontier import CrawlFrontier, advertiser_url
+from .media import PREVIEW_FIELDS
+from .memory_guard import MemoryMonitor, fast_forward, load_seen_ids, save_seen_ids
+from .profiling import make_profiler, run_profile_dir
+from .registry import AdRegistry, now_iso
+from .tagging import KeywordTagger, TagIndex, load_keywords
+from .store import (
+    create_ad_signature,
+    generate_timestamp,
+    load_ads,
+    rows_to_organizer,
+    save_ads,
+    to_organizer_ad,
+    write_rows_csv,
+)
+from .urls import clean_domain, extract_redirect_url
+
+CARD_SELECTOR = '._7jyh'
+
+# Cheap identity probe for a whole batch of cards in one round-trip: the Ad
+# Library ID where the card shows one, a digest of its text and media paths
+# (CDN query strings are re-signed on every load, so they're left out) and
+# the "Started running on" date. cyrb53 is a small, fast 53-bit string hash.
+PROBE_JS = """cards => {
+    const cyrb53 = (str) => {
+        let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+        for (let i = 0; i < str.length; i++) {
+            const ch = str.charCodeAt(i);
+            h1 = Math.imul(h1 ^ ch, 2654435761);
+            h2 = Math.imul(h2 ^ ch, 1597334677);
+        }
+        h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+        h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+        return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16);
+    };
+    return cards.map(card => {
+        const text = (card.textContent || "").replace(/\s+/g, " ");
+        const media = Array.from(card.querySelectorAll("img, video"), el => (el.getAttribute("src") || "").split("?")[0]);
+        const libraryId = (text.match(/Library ID:?\s*(\d+)/i) || [])[1] || "";
+        const started = (text.match(/Started running on\s*(\w+ \d{1,2},? \d{4}|\d{1,2} \w+,? \d{4})/i) || [])[1] || "";
+        const fingerprint = cyrb53(text + "|" + media.join("|"));
+        return {
+            identity: libraryId ? "lib:" + libraryId : "fp:" + fingerprint,
+            libraryId,
+            started,
+            fingerprint,
+        };
+    });
+}"""
+
+STARTED_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%b %d %Y", "%d %b, %Y")
+
+
+def probe_cards(page, cards):
+    """Identity probes for `cards`, in the same order"""
+    return page.evaluate(PROBE_JS, cards) if cards else []
+
+
+def parse_started(text):
+    """'Started running on' date as YYYY-MM-DD, or "" if it can't be read"""
+    for fmt in STARTED_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return ""
+
+
+def launch_browser(p, headless=False):
+    return p.chromium.launch(
+        headless=headless,
+        args=['--disable-blink-features=AutomationControlled']
+    )
+
+
+def new_scrape_context(browser):
+    return browser.new_context(
+        viewport={'width': 1920, 'height': 1080},
+        user_agent=USER_AGENT,
+    )
+
+
+def open_library_page(browser, url):
+    """Open a fresh context on an Ad Library view and wait for the first cards"""
+    context = new_scrape_context(browser)
+    page = context.new_page()
+
+    print("⏳ Loading page...")
+    page.goto(url, wait_until='domcontentloaded', timeout=60000)
+    page.wait_for_timeout(5000)
+
+    # Wait for ads to load using the specific class
+    print("⏳ Waiting for ads to appear...")
+    try:
+        page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+        print("✅ Ads loaded!\n")
+    except Exception:
+        print(f"❌ Could not find ads with class {CARD_SELECTOR}\n")
+
+    return context, page
+
+
+def extract_ad(card, tagger=None):
+    """Extract one Ad Library card; returns None if it lacks the minimum data"""
+    # === ADVERTISER NAME ===
+    advertiser = "Unknown Advertiser"
+    page_id = ""
+
+    # Look for advertiser link (contains page_id or ads/library)
+    advertiser_link = card.query_selector('a.xt0psk2.x1hl2dhg')
+    if advertiser_link:
+        advertiser = advertiser_link.inner_text().strip()
+        href = advertiser_link.get_attribute('href') or ''
+
+        # Extract page ID from various URL patterns
+        match = re.search(r'view_all_page_id=(\d+)', href)
+        if not match:
+            match = re.search(r'/(\d+)/', href)
+        if match:
+            page_id = match.group(1)
+
+    if not advertiser or advertiser == "Unknown Advertiser":
+        # Fallback: look for any strong text near top
+        strong = card.query_selector('strong')
+        if strong and "Sponsored" not in strong.inner_text():
+            advertiser = strong.inner_text().strip()
+
+    # === PROFILE IMAGE ===
+    profile_img = ""
+
+    # Look for the profile image (class _8nqq)
+    profile_img_el = card.query_selector('img._8nqq')
+    if profile_img_el:
+        profile_img = profile_img_el.get_attribute('src') or ''
+
+    if not profile_img:
+        # Fallback: first small image
+        all_imgs = card.query_selector_all('img')
+        for img in all_imgs:
+            src = img.get_attribute('src') or ''
+            if 'scontent' in src and any(s in src for s in ['s60x60', 's50x50', 's40x40']):
+                profile_img = src
+                break
+
+    # === AD BODY TEXT ===
+    body_text = ""
+
+    # Look for white-space: pre-wrap div (this is where ad text usually is)
+    text_el = card.query_selector('div[style*="white-space: pre-wrap"]')
+    if text_el:
+        body_text = text_el.inner_text().strip()
+
+    if not body_text:
+        # Look for _4ik4 _4ik5 divs
+        text_divs = card.query_selector_all('._4ik4._4ik5')
+        for div in text_divs:
+            text = div.inner_text().strip()
+            if len(text) > 20 and "Sponsored" not in text:
+                body_text = text
+                break
+
+    # === MEDIA (Video or Image) ===
+    media_type = ""
+    media_url = ""
+    poster_url = ""
+
+    # Check for video first
+    video = card.query_selector('video')
+    if video:
+        media_type = "video"
+        media_url = video.get_attribute('src') or ''
+        poster_url = video.get_attribute('poster') or ''
+
+    if not media_url:
+        # Look for main ad image (not profile pic)
+        all_imgs = card.query_selector_all('img')
+        for img in all_imgs:
+            src = img.get_attribute('src') or ''
+            if 'scontent' in src:
+                # Skip small images (profile pics)
+                if not any(s in src for s in ['s60x60', 's50x50', 's40x40', 's80x80', '_s.']):
+                    media_type = "image"
+                    media_url = src
+                    break
+
+    # === CTA LINK & BUTTON ===
+    cta_url = ""
+    cta_caption = ""
+    cta_button_text = ""
+    link_description = ""
+
+    # Look for external links
+    all_links = card.query_selector_all('a[href]')
+    for link in all_links:
+        href = link.get_attribute('href') or ''
+
+        # Look for l.facebook.com redirect links
+        if 'l.facebook.com' in href:
+            cta_url = extract_redirect_url(href)
+            if cta_url and 'facebook.com' not in cta_url:
+                cta_caption = clean_domain(cta_url)
+
+                # Try to get button text from parent
+                button_text = link.inner_text().strip()
+                if button_text and len(button_text) < 50:
+                    cta_button_text = button_text
+                break
+
+    # Look for link description text
+    link_divs = card.query_selector_all('div[tabindex="0"]')
+    for div in link_divs:
+        text = div.inner_text().strip()
+        if text and len(text) > 10 and len(text) < 200:
+            if text != advertiser and text != body_text and 'FACEBOOK.COM' not in text:
+                link_description = text
+                break
+
+    # === CHECK IF WE HAVE MINIMUM DATA ===
+    if not advertiser or advertiser == "Unknown Advertiser":
+        return None
+
+    if not body_text and not media_url:
+        return None
+
+    # === KEYWORD TAGS ===
+    tags, keywords = tagger.tag(body_text, link_description) if tagger else ([], [])
+
+    # === BUILD RESULT ===
+    return {
+        "advertiser": advertiser,
+        "page_id": page_id,
+        "profile_image": profile_img,
+        "body_text": body_text,
+        "media_type": media_type,
+        "media_url": media_url,
+        "video_poster": poster_url,
+        "cta_url": cta_url,
+        "cta_caption": cta_caption,
+        "cta_button_text": cta_button_text or "Download",
+        "link_description": link_description,
+        "timestamp": generate_timestamp(),
+        "tags": ";".join(tags),
+        "keywords": ";".join(keywords),
+    }
+
+
+class AdLibraryScraper:
+    """Collects new ads into ``results`` (scraper rows) and merges them into the JSON"""
+
+    def __init__(self, config=None):
+        self.config = config or ScrapeConfig()
+        self.results = []
+        self.seen_ids = set()
+        self.existing_ads = []
+        self.existing_signatures = set()
+        self.existing_card_ids = set()
+        self.lock = threading.Lock()
+        self.active_browsers = 1  # Browsers running at once, which share the browser memory budget
+        self.memory_monitor = None
+        self.registry = None
+        self.tagger = KeywordTagger(load_keywords(self.config.keywords_file)) if self.config.tagging else None
+        self.stats = {
+            "duplicates": 0,
+            "unchanged": 0,
+            "changed": 0,
+            "scrolls": 0,
+            "recycles": 0,
+            "sweep_ads": 0,
+            "fan_out_ads": 0,
+        }
+        self.profiler = make_profiler(self.config.profile, run_profile_dir(self.config.profile_dir, "scrape"))
+        self._sweep_no = 0
+
+    def load_state(self):
+        """Load existing ads and the persisted seen-set so only new ads are kept"""
+        config = self.config
+        self.existing_ads = load_ads(config.output_json)
+        self.existing_signatures = {create_ad_signature(ad) for ad in self.existing_ads}
+        self.existing_card_ids = {ad["cardId"] for ad in self.existing_ads if ad.get("cardId")}
+        print(f"📚 Found {len(self.existing_ads)} existing ads in {config.output_json}")
+
+        # The registry supersedes the persisted seen-set: known cards must
+        # still reach it so their last_seen gets updated
+        if config.delta:
+            self.registry = AdRegistry(config.registry_file)
+            print(f"🔁 Delta sweep: {len(self.registry.entries)} known ads in {config.registry_file}")
+
+        if config.memory_bounded:
+            if not config.delta:
+                self.seen_ids = load_seen_ids(config.seen_file)
+                print(f"👀 {len(self.seen_ids)} cards already processed in earlier sessions")
+            self.memory_monitor = MemoryMonitor(config.max_browser_mb, config.max_process_mb)
+            print(f"🧠 Memory-bounded mode: recycling above {config.max_browser_mb} MB browser / {config.max_process_mb} MB python\n")
+
+    def claim_card(self, probe):
+        """'new' or 'changed' if the card needs extracting, None if it can be skipped
+
+        Skipped means already handled during this run, or (delta sweeps) known
+        from an earlier run and unchanged, in which case only last_seen moves.
+        A claimed card only enters the registry once keep_if_new settles it.
+        """
+        identity = probe["identity"]
+        with self.lock:
+            if identity in self.seen_ids:
+                return None
+            self.seen_ids.add(identity)
+            if self.registry is None:
+                return "new"
+
+            status = self.registry.check(identity, probe["fingerprint"])
+            if status == "known":
+                self.registry.touch(identity)
+                self.stats["unchanged"] += 1
+                return None
+            return status
+
+    def release_card(self, probe):
+        """Give back a claimed card that couldn't be extracted (often not hydrated yet) so a later scroll retries it"""
+        with self.lock:
+            self.seen_ids.discard(probe["identity"])
+
+    def apply_probe(self, ad_data, probe):
+        """Carry the probe's identity and first/last-seen times onto an extracted row"""
+        ad_data["card_id"] = probe["identity"]
+        ad_data["library_id"] = probe["libraryId"]
+        ad_data["started_running"] = parse_started(probe["started"])
+        entry = self.registry.entries.get(probe["identity"], {}) if self.registry else {}
+        ad_data["last_seen"] = now_iso()
+        ad_data["first_seen"] = entry.get("first_seen") or ad_data["last_seen"]
+        return ad_data
+
+    def keep_if_new(self, ad_data, probe, status="new"):
+        """Record an extracted ad unless it duplicates one we already have
+
+        Either way the card is settled, so (delta sweeps) its fingerprint goes
+        into the registry now and not before, when extraction could still fail.
+        """
+        signature = create_ad_signature(ad_data)
+        with self.lock:
+            # A changed ad replaces its earlier version in save(), whatever its
+            # signature, but only if that version is saved under its card id;
+            # otherwise it is deduped like a new one
+            if status == "changed" and ad_data.get("card_id") in self.existing_card_ids:
+                self.results.append(ad_data)
+                self.stats["changed"] += 1
+                kept = True
+            elif signature in self.existing_signatures:
+                self.stats["duplicates"] += 1
+                kept = False
+            else:
+                self.results.append(ad_data)
+                kept = True
+            self.existing_signatures.add(signature)
+            if self.registry is not None:
+                self.registry.record(probe["identity"], probe["fingerprint"], ad_data["last_seen"])
+            return kept
+
+    def sweep(self, browser, url):
+        """Scroll one Ad Library search, extracting new ads until the target or the end"""
+        config = self.config
+        profiler = self.profiler
+        self._sweep_no += 1
+        with profiler.phase("open_page"):
+            context, page = open_library_page(browser, url)
+
+        collected = 0
+        scroll_count = 0
+        trace_window = None
+        max_scrolls = None if config.memory_bounded else config.max_scrolls
+        no_new_ads = 0
+        last_height = 0
+
+        print("📜 Scrolling and collecting ads...\n")
+
+        while collected < config.target and (max_scrolls is None or scroll_count < max_scrolls):
+            trace_window = self._trace_step(context, scroll_count, trace_window)
+
+            # Get all ad cards using the specific class ._7jyh
+            with profiler.phase("query_cards"):
+                cards = page.query_selector_all(CARD_SELECTOR)
+
+            if not cards:
+                print(f"   ⚠️ No cards found on scroll {scroll_count + 1}")
+                # No results, a login wall or a blocked page: without max_scrolls
+                # (memory-bounded) only this stall count ends the sweep
+                no_new_ads += 1
+                if no_new_ads >= 5:
+                    print(f"\n⚠️ No ad cards after 5 scrolls. Stopping.")
+                    break
+                scroll_count += 1
+                page.evaluate("window.scrollBy(0, 1000)")
+                page.wait_for_timeout(2000)
+                continue
+
+            current_batch = 0
+
+            with profiler.phase("probe"):
+                probes = probe_cards(page, cards)
+
+            for idx, (card, probe) in enumerate(zip(cards, probes)):
+                try:
+                    status = self.claim_card(probe)
+                    if status is None:
+                        continue
+
+                    with profiler.phase("extract"):
+                        ad_data = extract_ad(card, self.tagger)
+                    if ad_data is None:
+                        self.release_card(probe)
+                        continue
+                    self.apply_probe(ad_data, probe)
+
+                    if not self.keep_if_new(ad_data, probe, status):
+                        print(f"   ⏭️  Duplicate: {ad_data['advertiser'][:30]}")
+                        continue
+
+                    collected += 1
+                    current_batch += 1
+
+                    # Show preview
+                    preview = f"{ad_data['advertiser'][:30]}"
+                    if ad_data["media_type"]:
+                        preview += f" [{ad_data['media_type']}]"
+                    if ad_data["cta_caption"]:
+                        preview += f" → {ad_data['cta_caption']}"
+
+                    print(f"   ✅ #{len(self.results)}: {preview}")
+
+                    if collected >= config.target:
+                        break
+
+                except Exception as e:
+                    print(f"   ⚠️ Error on card {idx}: {str(e)}")
+                    self.release_card(probe)
+                    continue
+
+            # Stretches of already-known cards are expected when sweeping to
+            # exhaustion, so there only a page that stopped growing means the end
+            if config.memory_bounded:
+                page_height = page.evaluate("document.body.scrollHeight")
+                progressed = page_height > last_height
+                last_height = page_height
+            else:
+                progressed = current_batch > 0
+
+            if not progressed:
+                no_new_ads += 1
+                if no_new_ads >= 5:
+                    print(f"\n⚠️ No new ads after 5 scrolls. Stopping.")
+                    break
+            else:
+                no_new_ads = 0
+
+            # Recycle the context before the tab gets sluggish, then pick up where we left off
+            if config.memory_bounded and scroll_count and scroll_count % config.memory_check_every == 0:
+                if self.memory_monitor.over_limit(page):
+                    scroll_y = page.evaluate("window.scrollY")
+                    print(f"\n♻️  Recycling context ({self.memory_monitor.describe()}) at scroll {scroll_count}")
+                    trace_window = self._stop_trace(context, trace_window, scroll_count)
+                    with profiler.phase("recycle"):
+                        save_seen_ids(config.seen_file, self.seen_ids)
+                        context.close()
+                        context, page = open_library_page(browser, url)
+                        fast_forward(page, scroll_y)
+                        last_height = page.evaluate("document.body.scrollHeight")
+                    self.stats["recycles"] += 1
+                    print(f"⏩ Resumed at y={scroll_y}\n")
+
+            # Scroll down
+            scroll_count += 1
+            with profiler.phase("scroll_wait"):
+                page.evaluate("window.scrollBy(0, window.innerHeight * 1.5)")
+                page.wait_for_timeout(3000)
+
+        self._stop_trace(context, trace_window, scroll_count)
+        context.close()
+        self.stats["scrolls"] += scroll_count
+        self.stats["sweep_ads"] += collected
+        return collected
+
+    def _trace_step(self, context, scroll_count, active):
+        """Start or stop Playwright tracing at the trace_scrolls boundaries; returns the open window"""
+        if not self.profiler.enabled:
+            return None
+        if active and scroll_count >= active[1]:
+            active = self._stop_trace(context, active, scroll_count)
+        if active is None:
+            for start, end in self.config.trace_scrolls:
+                if start <= scroll_count < end:
+                    context.tracing.start(screenshots=True, snapshots=True)
+                    return (scroll_count, end)
+        return active
+
+    def _stop_trace(self, context, active, scroll_count):
+        if active:
+            path = self.profiler.output_dir / f"trace_sweep{self._sweep_no}_scrolls{active[0]}-{scroll_count}.zip"
+            context.tracing.stop(path=str(path))
+            print(f"   🎞️  Trace saved: {path}")
+        return None
+
+    def crawl_advertiser(self, browser, entry):
+        """Collect up to fan_out_per_advertiser new ads from one advertiser's all-ads view
+
+        The view is for the entry's country if it has one (coordinator shards),
+        else the configured one. The crawl gets its own context, recycled like a
+        sweep's when memory runs high, and stops at fan_out_max_scrolls even if
+        the page keeps growing with ads that are all known already.
+        """
+        config = self.config
+        url = advertiser_url(entry["page_id"], entry.get("country") or config.country)
+        context = new_scrape_context(browser)
+        try:
+            page = context.new_page()
+            page.goto(url, wait_until='domcontentloaded', timeout=60000)
+            # No cards is usually a load failure, so this raises for the caller to
+            # retry (frontier requeue, shard fail) rather than counting as 0 ads
+            page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+
+            collected = 0
+            stalls = 0
+            last_height = 0
+            scroll_count = 0
+
+            while collected < config.fan_out_per_advertiser and stalls < 3 and scroll_count < config.fan_out_max_scrolls:
+                cards = page.query_selector_all(CARD_SELECTOR)
+                for card, probe in zip(cards, probe_cards(page, cards)):
+                    try:
+                        status = self.claim_card(probe)
+                        if status is None:
+                            continue
+
+                        with self.profiler.phase("extract"):
+                            ad_data = extract_ad(card, self.tagger)
+                        if ad_data is None:
+                            self.release_card(probe)
+                            continue
+                        self.apply_probe(ad_data, probe)
+                        if not ad_data["page_id"]:
+                            ad_data["page_id"] = entry["page_id"]
+
+                        if not self.keep_if_new(ad_data, probe, status):
+                            continue
+
+                        collected += 1
+                        if collected >= config.fan_out_per_advertiser:
+                            break
+                    except Exception:
+                        self.release_card(probe)
+                        continue
+
+                height = page.evaluate("document.body.scrollHeight")
+                stalls = stalls + 1 if height <= last_height else 0
+                last_height = height
+
+                if (self.memory_monitor and scroll_count and scroll_count % config.memory_check_every == 0
+                        and self.memory_monitor.over_limit(page, browsers=self.active_browsers)):
+                    scroll_y = page.evaluate("window.scrollY")
+                    print(f"   ♻️  Recycling context for {entry['page_id']} ({self.memory_monitor.describe()})")
+                    context.close()
+                    context = new_scrape_context(browser)
+                    page = context.new_page()
+                    page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                    fast_forward(page, scroll_y)
+                    last_height = page.evaluate("document.body.scrollHeight")
+                    with self.lock:
+                        self.stats["recycles"] += 1
+
+                scroll_count += 1
+                page.evaluate("window.scrollBy(0, window.innerHeight * 1.5)")
+                page.wait_for_timeout(2000)
+
+            with self.lock:
+                self.stats["scrolls"] += scroll_count
+            return collected
+        finally:
+            context.close()
+
+    def _fan_out_worker(self, worker_id, queue, frontier):
+        """One browser per thread (the sync API is not thread-safe), draining the shared queue"""
+        with sync_playwright() as p:
+            browser = launch_browser(p, self.config.headless)
+
+            while True:
+                try:
+                    entry = queue.get_nowait()
+                except Empty:
+                    break
+
+                try:
+                    with self.profiler.phase("crawl_advertiser"):
+                        collected = self.crawl_advertiser(browser, entry)
+                except Exception as e:
+                    print(f"   ⚠️ [w{worker_id}] Error on {entry['page_id']}: {str(e)}")
+                    # Back in the queue for the next run, not parked as crawled for recrawl_days
+                    with self.lock:
+                        frontier.requeue(entry)
+                    continue
+
+                with self.lock:
+                    frontier.mark_crawled(entry["page_id"], collected)
+                    self.stats["fan_out_ads"] += collected
+                print(f"   🏢 [w{worker_id}] {entry['advertiser'][:30]}: +{collected} ads")
+
+            browser.close()
+        # The budget of a finished worker goes to the ones still crawling
+        with self.lock:
+            self.active_browsers = max(1, self.active_browsers - 1)
+
+    def fan_out(self, sweep_results):
+        """Queue advertisers from the sweep and crawl a prioritized batch in parallel"""
+        config = self.config
+        frontier = CrawlFrontier(config.frontier_file)
+        newly_queued = sum(frontier.add(ad["page_id"], ad["advertiser"]) for ad in sweep_results)
+        batch = frontier.pop_batch(config.fan_out_max_advertisers, priority=config.fan_out_priority)
+
+        print(f"\n🕸️  Fan-out: {newly_queued} new advertisers queued, crawling {len(batch)} by {config.fan_out_priority}")
+        print(f"   ({len(frontier.pending)} still pending for later runs)\n")
+
+        if batch:
+            queue = Queue()
+            for entry in batch:
+                queue.put(entry)
+            workers = [
+                threading.Thread(target=self._fan_out_worker, args=(i + 1, queue, frontier))
+                for i in range(min(config.fan_out_workers, len(batch)))
+            ]
+            self.active_browsers = len(workers)
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            self.active_browsers = 1
+
+        frontier.save()
+
+    def run(self):
+        """Sweep every configured query, fan out, then save; returns the new organizer ads"""
+        config = self.config
+        urls = config.sweep_urls()
+
+        print("🚀 Starting Facebook Ad Library Scraper")
+        print(f"📍 Target: {config.target} NEW ads per query")
+        for url in urls:
+            print(f"🌐 URL: {url}")
+        print()
+
+        profiler = self.profiler
+        profiler.start()
+        try:
+            with profiler.phase("load_state"):
+                self.load_state()
+
+            with sync_playwright() as p:
+                print("🔧 Launching browser...")
+                browser = launch_browser(p, config.headless)
+                for url in urls:
+                    with profiler.phase("sweep"):
+                        self.sweep(browser, url)
+                browser.close()
+
+            if config.fan_out:
+                with profiler.phase("fan_out"):
+                    self.fan_out(list(self.results))
+
+            if config.memory_bounded and self.registry is None:
+                save_seen_ids(config.seen_file, self.seen_ids)
+
+            stats = self.stats
+            print(f"\n✅ Scraping complete!")
+            print(f"   New ads collected: {len(self.results)}")
+            print(f"   From keyword sweep: {stats['sweep_ads']} | From advertiser fan-out: {stats['fan_out_ads']}")
+            print(f"   Duplicates skipped: {stats['duplicates']}")
+            if self.registry is not None:
+                print(f"   Known & unchanged (not re-extracted): {stats['unchanged']} | Changed: {stats['changed']}")
+            print(f"   Scrolls: {stats['scrolls']} | Context recycles: {stats['recycles']}\n")
+
+            with profiler.phase("save"):
+                return self.save()
+        finally:
+            # Written even when the run fails, since that's often when it's wanted
+            report_dir = profiler.write_report()
+            if report_dir:
+                print(f"\n🔬 Profile: {report_dir}/phases.txt and flamegraph.svg")
+
+    def refresh_last_seen(self):
+        """Copy last_seen from the registry onto existing ads swept again; returns how many"""
+        if self.registry is None:
+            return 0
+        touched = self.registry.touched
+        refreshed = 0
+        for ad in self.existing_ads:
+            card_id = ad.get("cardId")
+            if card_id and card_id in touched:
+                ad["lastSeen"] = self.registry.entries[card_id]["last_seen"]
+                refreshed += 1
+        return refreshed
+
+    def save(self):
+        """Write new rows to CSV, merge new and changed ads into the organizer JSON"""
+        config = self.config
+        seen_again = self.refresh_last_seen()
+
+        # A changed ad replaces its earlier version, keeping that one's id and first-seen time
+        previous_by_card = {ad["cardId"]: ad for ad in self.existing_ads if ad.get("cardId")}
+        new_rows = []
+        updated_ads = []
+        for row in self.results:
+            previous = previous_by_card.get(row.get("card_id"))
+            if previous is None:
+                new_rows.append(row)
+                continue
+            kept = {key: previous[key] for key in ("id", "firstSeen", "timestamp") if previous.get(key)}
+            # Previews belong to the old creative; `media` derives them again
+            for key in PREVIEW_FIELDS:
+                previous.pop(key, None)
+            previous.update(to_organizer_ad(row, 0), **kept)
+            updated_ads.append(previous)
+
+        if not self.results and not seen_again:
+            print("❌ No new ads were collected.")
+            print(f"💾 Keeping existing {len(self.existing_ads)} ads in {config.output_json}")
+            if self.registry is not None:
+                self.registry.save()
+            return []
+
+        if self.results:
+            write_rows_csv(config.output_csv, self.results)
+            print(f"💾 Saved CSV: {config.output_csv}")
+
+        # Combine with existing ads for JSON
+        new_ads = rows_to_organizer(new_rows, start_index=len(self.existing_ads))
+        all_ads = self.existing_ads + new_ads
+        save_ads(config.output_json, all_ads)
+        print(f"💾 Saved JSON: {config.output_json}")
+
+        # Only once the ads are on disk, or a crash would leave them marked known but missing
+        if self.registry is not None:
+            self.registry.save()
+
+        # Keep the indexes in step with the JSON; changed ads may have a new landing page or tags
+        domain_index = DomainIndex(config.domain_index_file)
+        tag_index = TagIndex(config.tag_index_file)
+        for ad in updated_ads:
+            domain_index.remove(ad["id"])
+            tag_index.remove(ad["id"])
+        domain_index.add_all(new_ads + updated_ads)
+        domain_index.save()
+        print(f"📇 Domain index: {len(domain_index.domains)} landing domains in {config.domain_index_file}")
+
+        tagged = tag_index.add_all(new_ads + updated_ads)
+        tag_index.save()
+        print(f"🏷️  Tag index: {tagged} new or changed ads tagged, {len(tag_index.tags)} tags in {config.tag_index_file}")
+
+        print(f"\n📊 Summary:")
+        print(f"   Total ads in file: {len(all_ads)}")
+        print(f"   Previously existing: {len(self.existing_ads)}")
+        print(f"   Newly added: {len(new_ads)}")
+        if self.registry is not None:
+            print(f"   Updated (changed): {len(updated_ads)} | Seen again: {seen_again}")
+        print(f"   Duplicates skipped: {self.stats['duplicates']}")
+        return new_ads
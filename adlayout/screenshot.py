@@ -0,0 +1,187 @@
+"""Screenshot ads rendered in the Facebook clone, with render cache and encoding pool."""
+import json
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+from .config import ScreenshotConfig
+from .postprocess import ScreenshotPostProcessor
+from .profiling import make_profiler, run_profile_dir
+from .render_cache import RenderCache, template_digest
+from .store import screenshot_stem
+
+
+def match_cards(pending, cards, card_ids):
+    """Pair pending (idx, ad, stem) jobs with rendered cards; returns (pairs, trusted)
+
+    Cards carry their ad's id (data-ad-id). Without unique ids the pairing
+    falls back to render order, which is only trusted when the counts agree.
+    """
+    ad_ids = [ad.get("id") for _, ad, _ in pending]
+    if any(card_ids) and all(ad_ids) and len(set(ad_ids)) == len(ad_ids):
+        by_id = {}
+        for card, card_id in zip(cards, card_ids):
+            by_id.setdefault(card_id, []).append(card)
+        pairs = [(job, by_id[ad_id][0]) for job, ad_id in zip(pending, ad_ids) if len(by_id.get(ad_id, ())) == 1]
+        return pairs, True
+    return list(zip(pending, cards)), len(cards) == len(pending)
+
+
+def take_screenshots(organizer_ads, config=None):
+    """Screenshot each ad in the Facebook clone; returns the post-processing summary"""
+    config = config or ScreenshotConfig()
+    clone_url = Path(config.clone_path).resolve().as_uri()
+
+    print("\n" + "=" * 60)
+    print("📸 TAKING SCREENSHOTS")
+    print("=" * 60)
+    print(f"📁 Output: {config.output_dir}/\n")
+
+    profiler = make_profiler(config.profile, run_profile_dir(config.profile_dir, "screenshot"))
+    profiler.start()
+    try:
+        return _take_screenshots(organizer_ads, config, clone_url, profiler)
+    finally:
+        report_dir = profiler.write_report()
+        if report_dir:
+            print(f"\n🔬 Profile: {report_dir}/phases.txt and flamegraph.svg")
+
+
+def _take_screenshots(organizer_ads, config, clone_url, profiler):
+    render_cache = RenderCache(
+        config.cache_dir,
+        template_digest(config.clone_path),
+        config.viewport,
+        theme=config.theme,
+        max_bytes=config.cache_max_mb * 1024 * 1024,
+        max_age_days=config.cache_max_age_days,
+    )
+
+    # Encoding runs in a process pool, so capture never waits on compression
+    postprocessor = ScreenshotPostProcessor(
+        config.output_dir,
+        formats=config.formats,
+        quality=config.quality,
+        thumbnail_width=config.thumbnail_width,
+        contact_sheets=config.contact_sheets,
+        workers=config.encode_workers,
+    )
+
+    # Serve unchanged ads straight from the cache, queue the rest for rendering
+    pending = []
+    fake = 0
+    with profiler.phase("cache_lookup"):
+        for idx, ad in enumerate(organizer_ads):
+            # The clone is switched to real ads below, so fake ones never render
+            if ad.get("isFakeAd") is True:
+                fake += 1
+                continue
+            advertiser_name = ad["pageName"] or "Unknown"
+            stem = screenshot_stem(idx, advertiser_name)
+            cached = render_cache.get(ad)
+            if cached:
+                # Unchanged render with unchanged encode settings: copy the earlier outputs
+                encoded_dir = render_cache.encoded_dir(render_cache.key_for(ad), postprocessor.settings_key)
+                if not postprocessor.restore(encoded_dir, stem, advertiser_name, cached.stat().st_size):
+                    postprocessor.submit(cached.read_bytes(), stem, advertiser_name, encoded_dir)
+            else:
+                pending.append((idx, ad, stem))
+
+    print(f"♻️  Cached: {render_cache.hits} | 🆕 To render: {len(pending)}")
+    if fake:
+        print(f"⏭️  Skipped {fake} fake ads (the clone only shows real ones)")
+    print()
+
+    if pending:
+        with sync_playwright() as p:
+            with profiler.phase("page_setup"):
+                browser = p.chromium.launch(headless=config.headless)
+                page = browser.new_page(viewport=config.viewport)
+
+                print("⏳ Loading Facebook clone...")
+                page.goto(clone_url)
+                page.wait_for_timeout(1000)
+
+                # Inject only the ads that need rendering, plus the theme
+                print("💾 Injecting ads...")
+                pending_ads = [ad for _, ad, _ in pending]
+                page.evaluate(
+                    '([ads, dark]) => { localStorage.setItem("manual_ads_data", ads); localStorage.setItem("dark-mode", dark); }',
+                    [json.dumps(pending_ads), "true" if config.theme == "dark" else "false"],
+                )
+
+                print("🔄 Reloading...")
+                page.reload()
+                page.wait_for_timeout(2000)
+
+                # Click load button
+                try:
+                    page.click('#load-ads-btn')
+                    page.wait_for_timeout(2000)
+                except Exception:
+                    pass
+
+                # Toggle to real ads
+                try:
+                    is_checked = page.evaluate('document.getElementById("fake-ads-toggle")?.checked')
+                    if is_checked:
+                        page.click('#fake-ads-toggle')
+                        page.wait_for_timeout(1000)
+                except Exception:
+                    pass
+
+                print("⏳ Waiting for ads to render...")
+                page.wait_for_timeout(3000)
+
+                ad_cards = page.query_selector_all('.ad-post')
+                card_ids = [card.get_attribute("data-ad-id") for card in ad_cards]
+                pairs, trusted = match_cards(pending, ad_cards, card_ids)
+
+            if not ad_cards:
+                print("❌ No ad cards found!")
+            else:
+                print(f"✅ Found {len(ad_cards)} cards\n")
+                if len(pairs) < len(pending):
+                    print(f"⚠️  {len(pending) - len(pairs)} ads didn't render and are skipped")
+                # A card paired with the wrong ad would be served from the cache on every later run
+                if not trusted:
+                    print(f"⚠️  {len(ad_cards)} cards for {len(pending)} ads: screenshots are not cached this run")
+                print("📸 Taking screenshots...\n")
+
+            for (idx, ad, stem), card in pairs:
+                try:
+                    with profiler.phase("scroll_wait"):
+                        card.scroll_into_view_if_needed()
+                        page.wait_for_timeout(500)
+
+                    # Keep the raw PNG in memory; encoding happens off the capture loop
+                    with profiler.phase("capture"):
+                        png_bytes = card.screenshot()
+                    with profiler.phase("cache_submit"):
+                        encoded_dir = None
+                        if trusted:
+                            render_cache.put_bytes(ad, png_bytes)
+                            encoded_dir = render_cache.encoded_dir(render_cache.key_for(ad), postprocessor.settings_key)
+                        postprocessor.submit(png_bytes, stem, ad["pageName"] or "Unknown", encoded_dir)
+
+                    print(f"   ✅ {idx+1}/{len(organizer_ads)}: {ad['pageName'][:40]}")
+
+                except Exception as e:
+                    print(f"   ⚠️  Error on card {idx+1}: {str(e)}")
+
+            browser.close()
+
+    print("\n⏳ Finishing encoding...")
+    with profiler.phase("encode_wait"):
+        summary = postprocessor.close()
+
+    # After the encodes are cached, so eviction removes them along with their render
+    evicted = render_cache.save()
+    if evicted:
+        print(f"🧹 Evicted {evicted} cached renders")
+    if summary["bytes_in"]:
+        saved = 100 - 100 * summary["bytes_out"] / summary["bytes_in"]
+        print(f"🗜️  Encoded {summary['images']} screenshots ({summary['reused']} reused from cache): {summary['bytes_in'] / 1024 / 1024:.1f} MB → {summary['bytes_out'] / 1024 / 1024:.1f} MB ({saved:.0f}% smaller)")
+    if summary["contact_sheets"]:
+        print(f"🗂️  Contact sheets: {len(summary['contact_sheets'])}")
+    return summary
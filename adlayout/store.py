@@ -0,0 +1,195 @@
+"""Ad records on disk: scraper rows (CSV) and organizer ads (JSON).
+
+Only the standard library is used here so convert/dedupe/export start
+instantly.
+"""
+import csv
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+# Columns of the raw scraper rows, in CSV order
+ROW_FIELDS = [
+    "advertiser",
+    "page_id",
+    "profile_image",
+    "body_text",
+    "media_type",
+    "media_url",
+    "video_poster",
+    "cta_url",
+    "cta_caption",
+    "cta_button_text",
+    "link_description",
+    "timestamp",
+    "card_id",
+    "library_id",
+    "started_running",
+    "first_seen",
+    "last_seen",
+    "tags",
+    "keywords",
+]
+
+# Keys of an organizer ad, in the order to_organizer_ad() builds them
+ORGANIZER_FIELDS = [
+    "id",
+    "pageName",
+    "pageId",
+    "bodyText",
+    "headerText",
+    "descriptionText",
+    "captionText",
+    "ctaButtonText",
+    "linkUrl",
+    "snapshotUrl",
+    "startTime",
+    "endTime",
+    "currency",
+    "spend",
+    "timestamp",
+    "isSponsored",
+    "imageUrl",
+    "videoUrl",
+    "profilePictureUrl",
+    "isFakeAd",
+    "mediaType",
+    "cardId",
+    "libraryId",
+    "firstSeen",
+    "lastSeen",
+    "tags",
+    "keywords",
+]
+
+
+def generate_timestamp():
+    """Generate random timestamp for display"""
+    units = ["m", "h", "d", "w"]
+    unit = random.choice(units)
+    if unit == "m":
+        value = random.randint(5, 59)
+    elif unit == "h":
+        value = random.randint(1, 23)
+    elif unit == "d":
+        value = random.randint(1, 6)
+    else:
+        value = random.randint(1, 4)
+    return f"{value}{unit}"
+
+
+def safe_filename(text, limit=50):
+    return "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in text)[:limit]
+
+
+def screenshot_stem(idx, advertiser_name):
+    return f"{idx+1:03d}_{safe_filename(advertiser_name)}"
+
+
+def create_ad_signature(ad):
+    """Create a unique signature for an ad to detect duplicates"""
+    # Use advertiser + first 100 chars of body text as signature. Accepts both
+    # scraper rows and organizer ads so existing JSON can be checked too.
+    text = (ad.get('body_text') or ad.get('bodyText') or '')[:100]
+    advertiser = ad.get('advertiser') or ad.get('pageName') or ''
+    return f"{advertiser}_{text}"
+
+
+def load_ads(path):
+    """Load existing ads from JSON file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"📝 No existing ads file found at {path}. Will create new one.")
+        return []
+    except json.JSONDecodeError:
+        print(f"⚠️  Existing ads file {path} is corrupted. Will create new one.")
+        return []
+
+
+def save_ads(path, ads):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(ads, f, indent=2, ensure_ascii=False)
+
+
+def read_rows_csv(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def write_rows_csv(path, rows, fields=ROW_FIELDS):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: "" if row.get(key) is None else row.get(key) for key in fields})
+
+
+def split_list(value):
+    """Tags/keywords are ';'-joined in scraper rows so they survive the CSV"""
+    if isinstance(value, list):
+        return value
+    return [item for item in (value or "").split(";") if item]
+
+
+def to_organizer_ad(row, index):
+    """Map one scraper row to the ad shape the clone pages and organizer read"""
+    media_type = row.get("media_type") or ""
+    media_url = row.get("media_url") or ""
+    return {
+        "id": f"scraped_{int(time.time())}_{index}",
+        "pageName": row["advertiser"],
+        "pageId": row.get("page_id") or "",
+        "bodyText": row.get("body_text") or "",
+        "headerText": "",
+        "descriptionText": row.get("link_description") or "",
+        "captionText": row.get("cta_caption") or "",
+        "ctaButtonText": row.get("cta_button_text") or "Download",
+        "linkUrl": row.get("cta_url") or "",
+        "snapshotUrl": "",
+        # Real start date when the card showed one, else when we first saw it
+        "startTime": row.get("started_running") or row.get("first_seen") or datetime.now().isoformat(),
+        "endTime": None,
+        "currency": "PHP",
+        "spend": None,
+        "timestamp": row.get("timestamp") or generate_timestamp(),
+        "isSponsored": True,
+        "imageUrl": media_url if media_type == "image" else row.get("video_poster") or "",
+        "videoUrl": media_url if media_type == "video" else "",
+        "profilePictureUrl": row.get("profile_image") or "",
+        "isFakeAd": False,
+        "mediaType": media_type,
+        "cardId": row.get("card_id") or "",
+        "libraryId": row.get("library_id") or "",
+        "firstSeen": row.get("first_seen") or "",
+        "lastSeen": row.get("last_seen") or "",
+        "tags": split_list(row.get("tags")),
+        "keywords": split_list(row.get("keywords")),
+    }
+
+
+def rows_to_organizer(rows, start_index=0):
+    return [to_organizer_ad(row, start_index + i) for i, row in enumerate(rows)]
+
+
+def dedupe_ads(ads):
+    """Drop repeated ads, keeping the first occurrence; returns (kept, dropped)"""
+    seen = set()
+    kept = []
+    for ad in ads:
+        signature = create_ad_signature(ad)
+        if signature in seen:
+            continue
+        seen.add(signature)
+        kept.append(ad)
+    return kept, len(ads) - len(kept)
+
+
+def atomic_write_json(path, data, **kwargs):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp_path, path)
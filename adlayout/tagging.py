@@ -0,0 +1,199 @@
+"""Keyword tagging of ad text with an Aho-Corasick automaton.
+
+The whole dictionary (English and Filipino scam indicators by default) is
+compiled into one automaton, so tagging an ad is a single pass over its
+text no matter how many terms there are. Terms match whole words only
+unless they start or end with ``*`` (``*utang`` also matches "mangutang").
+Text in scripts without word spacing (CJK) is always matched as a substring.
+"""
+import json
+from collections import deque
+
+from .store import atomic_write_json
+
+INDEX_FILE = "tag_index.json"
+
+# tag -> terms. Override with a JSON file of the same shape (--keywords).
+DEFAULT_KEYWORDS = {
+    "deposit": [
+        "deposit", "deposito", "*deposit", "min deposit", "minimum deposit", "first deposit",
+        "cash in", "cash-in", "top up", "top-up", "gcash", "paymaya", "bank transfer",
+    ],
+    "bonus": [
+        "bonus", "welcome bonus", "free credit", "free credits", "free 100", "free 188", "cashback",
+        "rebate", "free spins", "free spin", "free bet", "freebet", "jackpot", "libre", "libreng",
+        "claim now", "claim your", "daily reward", "*bonus",
+    ],
+    "withdraw": [
+        "withdraw", "withdrawal", "*withdraw", "cash out", "cashout", "cash-out", "payout",
+        "instant withdrawal", "fast withdrawal", "withdraw agad", "kuha agad", "makuha agad",
+    ],
+    "casino": [
+        "casino", "online casino", "slot", "slots", "slot machine", "jili", "pg soft", "pgsoft",
+        "baccarat", "roulette", "poker", "blackjack", "sabong", "e-sabong", "esabong", "sports bet",
+        "betting", "taya", "*taya", "pusta", "scatter", "super ace", "fortune gems", "color game",
+        "perya", "lucky spin", "big win", "panalo", "manalo", "*panalo",
+    ],
+    "lending": [
+        "loan", "loans", "online loan", "cash loan", "salary loan", "lending", "pautang", "utang",
+        "*utang", "quick cash", "instant cash", "no collateral", "walang collateral", "low interest",
+        "mababang interes", "approve agad", "approved agad", "fast approval", "same day release",
+    ],
+    "income": [
+        "guaranteed income", "passive income", "double your money", "doble", "kumita", "*kumita",
+        "kita agad", "earn daily", "daily income", "investment", "invest now", "crypto", "trading signal",
+    ],
+}
+
+
+def load_keywords(path=None):
+    """Keyword dictionary from a JSON file ({tag: [terms]}), or the built-in one"""
+    if not path:
+        return DEFAULT_KEYWORDS
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_word_char(ch):
+    # CJK and later scripts are written without spaces, so they never need a boundary
+    return ch.isalnum() and ord(ch) < 0x2E80
+
+
+class KeywordTagger:
+    """Aho-Corasick automaton over a {tag: [terms]} dictionary"""
+
+    def __init__(self, keywords=None):
+        keywords = DEFAULT_KEYWORDS if keywords is None else keywords
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]  # Pattern indexes ending at each state, fail-chain outputs included
+        self.patterns = []  # (term, tags, needs left boundary, needs right boundary)
+
+        terms = {}
+        for tag, tag_terms in keywords.items():
+            tag = tag.strip().casefold()  # TagIndex.lookup casefolds its query
+            for raw in tag_terms:
+                term = raw.strip().casefold()
+                if term.strip("*"):
+                    terms.setdefault(term, set()).add(tag)
+        for term, tags in terms.items():
+            self._add(term, tags)
+        self._build()
+
+    def _add(self, term, tags):
+        left = not term.startswith("*")
+        right = not term.endswith("*")
+        word = term.strip("*")
+        state = 0
+        for ch in word:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append(len(self.patterns))
+        self.patterns.append((word, sorted(tags), left and is_word_char(word[0]), right and is_word_char(word[-1])))
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def matches(self, text):
+        """Every dictionary term found in `text`, as a set of pattern indexes"""
+        text = text.casefold()
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        found = set()
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                if index in found:
+                    continue
+                word, _, left, right = patterns[index]
+                start = end - len(word) + 1
+                if left and start > 0 and is_word_char(text[start - 1]):
+                    continue
+                if right and end + 1 < len(text) and is_word_char(text[end + 1]):
+                    continue
+                found.add(index)
+        return found
+
+    def tag(self, *texts):
+        """(tags, keywords) for the given texts, both sorted"""
+        tags = set()
+        keywords = set()
+        for text in texts:
+            if not text:
+                continue
+            for index in self.matches(text):
+                word, word_tags, _, _ = self.patterns[index]
+                keywords.add(word)
+                tags.update(word_tags)
+        return sorted(tags), sorted(keywords)
+
+
+class TagIndex:
+    """Persistent inverted index: tag -> ad ids and matched keyword -> ad ids"""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.tags = {}
+        self.keywords = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.tags = data.get("tags", {})
+        self.keywords = data.get("keywords", {})
+
+    def save(self):
+        atomic_write_json(self.path, {"tags": self.tags, "keywords": self.keywords}, indent=2, ensure_ascii=False)
+
+    def add(self, ad):
+        """Index one organizer-format ad by its tags and keywords; returns True if it had any"""
+        ad_id = ad.get("id")
+        if not ad_id:
+            return False
+        for bucket, names in ((self.tags, ad.get("tags") or []), (self.keywords, ad.get("keywords") or [])):
+            for name in names:
+                ids = bucket.setdefault(name, [])
+                if ad_id not in ids:
+                    ids.append(ad_id)
+        return bool(ad.get("tags"))
+
+    def add_all(self, ads):
+        return sum(1 for ad in ads if self.add(ad))
+
+    def remove(self, ad_id):
+        """Drop an ad from every tag and keyword, and names left without ads"""
+        self.remove_all([ad_id])
+
+    def remove_all(self, ad_ids):
+        ad_ids = set(ad_ids)
+        for bucket in (self.tags, self.keywords):
+            for name in list(bucket):
+                bucket[name] = [ad_id for ad_id in bucket[name] if ad_id not in ad_ids]
+                if not bucket[name]:
+                    del bucket[name]
+
+    def lookup(self, name):
+        """Ad ids under a tag, or else under a matched keyword"""
+        name = name.strip().casefold()
+        return self.tags.get(name) or self.keywords.get(name) or []
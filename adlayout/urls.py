@@ -0,0 +1,100 @@
+from functools import lru_cache
+from urllib.parse import parse_qsl, unquote, urlencode, urlparse, urlunparse
+
+# Query parameters that only identify the click or the tracking pixel, never
+# the landing page itself
+TRACKING_PARAMS = {
+    "ch",
+    "fbpixelid",
+    "fbclid",
+    "gclid",
+    "ttclid",
+    "msclkid",
+    "sub_id",
+    "pixel_id",
+    "pixelid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# Second-level labels under which registrations happen one level deeper,
+# e.g. shop.example.com.ph -> example.com.ph
+SECOND_LEVEL_SUFFIXES = {"com", "net", "org", "gov", "edu", "co", "ac", "or", "ne", "go"}
+
+
+@lru_cache(maxsize=4096)
+def extract_redirect_url(fb_link):
+    """Extract actual URL from Facebook redirect link"""
+    try:
+        if not fb_link:
+            return ""
+
+        if "l.facebook.com" in fb_link:
+            params = dict(parse_qsl(urlparse(fb_link).query))
+            if 'u' in params:
+                return unquote(params['u'])
+
+        return fb_link
+    except Exception:
+        return fb_link
+
+
+@lru_cache(maxsize=4096)
+def hostname(url):
+    """Lowercase host without www., or "" if the URL has none"""
+    if not url:
+        return ""
+    if "//" not in url:
+        url = "//" + url
+    try:
+        host = urlparse(url).hostname or ""
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def clean_domain(url):
+    """Extract clean domain for display"""
+    return hostname(url).upper()
+
+
+@lru_cache(maxsize=4096)
+def registrable_domain(url):
+    """Domain an operator actually registers, e.g. bb.376jili.com -> 376jili.com"""
+    host = hostname(url)
+    labels = host.split(".")
+    if len(labels) <= 2 or host.replace(".", "").isdigit():
+        return host
+    if len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+@lru_cache(maxsize=4096)
+def normalize_url(url):
+    """Resolve Facebook redirects and strip tracking so equal landings compare equal"""
+    url = extract_redirect_url(url)
+    if not url:
+        return ""
+    try:
+        parsed = urlparse(url if "//" in url else "//" + url)
+    except ValueError:
+        return url
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not is_tracking_param(name)
+    )
+    path = parsed.path if parsed.path not in ("", "/") else ""
+    return urlunparse((
+        (parsed.scheme or "https").lower(),
+        hostname(url),
+        path,
+        "",
+        urlencode(query),
+        "",
+    ))
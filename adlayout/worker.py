@@ -0,0 +1,143 @@
+"""Scrape worker for the distributed coordinator: lease a shard, sweep it, post the rows.
+
+Runs the same extraction as a local scrape (``AdLibraryScraper.sweep`` and
+``crawl_advertiser``); dedupe, fan-out and the JSON/CSV/domain-index
+outputs are the coordinator's job.
+"""
+import os
+import socket
+import threading
+import time
+from urllib.error import URLError
+
+from playwright.sync_api import sync_playwright
+
+from .config import ScrapeConfig
+from .coordinator import CoordinatorClient, CoordinatorError
+from .memory_guard import MemoryMonitor
+from .scraper import AdLibraryScraper, launch_browser
+
+
+class LeaseKeeper:
+    """Heartbeats a shard's lease from a background thread while it is being swept"""
+
+    def __init__(self, client, shard, interval):
+        self.client = client
+        self.shard = shard
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.client.heartbeat(self.shard):
+                    self.lost = True
+                    print(f"   ⚠️ Lease on {self.shard} was reassigned")
+                    return
+            except (URLError, OSError, RuntimeError) as e:
+                print(f"   ⚠️ Heartbeat failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def scrape_shard(scraper, browser, shard):
+    """Run one shard through the normal extraction; returns the new rows"""
+    # Fresh per shard: a shard re-leased after a crash must be extracted again,
+    # and dedupe across workers happens on the coordinator anyway
+    scraper.results = []
+    scraper.seen_ids = set()
+    scraper.existing_signatures = set()
+
+    if shard["page_id"]:
+        scraper.crawl_advertiser(browser, {"page_id": shard["page_id"], "country": shard["country"]})
+    else:
+        scraper.sweep(browser, shard["url"])
+    return scraper.results
+
+
+def call_until_reachable(call, poll_seconds, max_wait=300, retry_client_errors=False):
+    """Retry a coordinator call through connection and server errors, backing off up to max_wait seconds
+
+    A 4xx means the request itself is wrong and is raised, unless
+    retry_client_errors is set.
+    """
+    wait = poll_seconds
+    while True:
+        try:
+            return call()
+        except CoordinatorError as e:
+            if e.status < 500 and not retry_client_errors:
+                raise
+            print(f"   ⚠️ {e}, retrying in {wait}s")
+        except (URLError, OSError) as e:
+            print(f"   ⚠️ Coordinator unreachable ({e}), retrying in {wait}s")
+        time.sleep(wait)
+        wait = min(wait * 2, max_wait)
+
+
+def run_worker(coordinator_url, config=None, worker_id=None, poll_seconds=10):
+    """Lease and scrape shards until the coordinator has none pending or leased"""
+    config = config or ScrapeConfig()
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    client = CoordinatorClient(coordinator_url, worker_id)
+
+    scraper = AdLibraryScraper(config)
+    if config.memory_bounded:
+        scraper.memory_monitor = MemoryMonitor(config.max_browser_mb, config.max_process_mb)
+
+    print(f"👷 Worker {worker_id} → {coordinator_url}")
+    done = 0
+
+    with sync_playwright() as p:
+        browser = launch_browser(p, config.headless)
+
+        while True:
+            shard, remaining = call_until_reachable(client.lease, poll_seconds, retry_client_errors=True)
+
+            if shard is None:
+                if not remaining:
+                    break
+                # Other workers hold the rest; wait in case one of their leases expires
+                time.sleep(poll_seconds)
+                continue
+
+            label = shard["query"] or f"page {shard['page_id']}"
+            print(f"\n📦 Shard {label} [{shard['country']}]")
+
+            with LeaseKeeper(client, shard["id"], max(shard["lease_seconds"] / 3, 1)) as keeper:
+                try:
+                    rows = scrape_shard(scraper, browser, shard)
+                except Exception as e:
+                    print(f"   ⚠️ Shard failed: {e}")
+                    # A reassigned shard is someone else's now; failing it would be a no-op
+                    if not keeper.lost:
+                        try:
+                            call_until_reachable(lambda: client.fail(shard["id"], str(e)), poll_seconds)
+                        except CoordinatorError as rejected:
+                            print(f"   ⚠️ {rejected}")
+                    continue
+
+            # Rows are still worth sending after losing the lease: the coordinator
+            # merges them, it just won't let this worker close the shard
+            if keeper.lost:
+                print("   ⚠️ Lease was lost mid-sweep; sending the rows anyway")
+            try:
+                reply = call_until_reachable(lambda: client.complete(shard["id"], rows), poll_seconds)
+            except CoordinatorError as e:
+                print(f"   ⚠️ Rows rejected: {e}")
+                continue
+            done += 1
+            print(f"   📤 Sent {len(rows)} rows: {reply['new']} new, {reply['duplicates']} already known")
+
+        browser.close()
+
+    print(f"\n✅ Worker {worker_id} finished {done} shards")
+    return done
@@ -37,6 +37,8 @@ class FacebookAdRenderer {
 
     const adElement = document.createElement("div");
     adElement.className = "ad-post bg-white rounded-lg shadow-sm mb-4";
+    // Lets screenshot tools pair each rendered card with its ad
+    if (adData.id) adElement.dataset.adId = adData.id;
 
     // Use provided URLs or fallback to ad data
     const profileImg =
@@ -170,12 +172,15 @@ class FacebookAdRenderer {
 
   renderMedia(adData) {
     if (adData.videoUrl) {
+      // With a derived poster the video itself isn't fetched until played
+      const poster = adData.posterUrl || adData.imageUrl || "";
       return `
             <div class="relative bg-black">
                 <video 
                     class="w-full max-h-[500px] object-contain"
                     controls
-                    poster="${adData.imageUrl || ""}"
+                    preload="${adData.posterUrl ? "none" : "metadata"}"
+                    poster="${poster}"
                     src="${adData.videoUrl}"
                 >
                 </video>
@@ -186,6 +191,7 @@ class FacebookAdRenderer {
             <div class="relative">
                 <img 
                     src="${adData.imageUrl}" 
+                    ${this.renderSrcset(adData)}
                     alt="Ad content"
                     class="w-full object-cover max-h-[600px]"
                     onerror="this.style.display='none'"
@@ -196,6 +202,16 @@ class FacebookAdRenderer {
     return "";
   }
 
+  // Thumbnail ladder from `python -m adlayout media`, with the original as the top rung
+  renderSrcset(adData) {
+    const ladder = adData.thumbnailUrls || {};
+    const widths = Object.keys(ladder);
+    if (!widths.length || !adData.mediaWidth) return "";
+    const candidates = widths.map((width) => `${ladder[width]} ${width}w`);
+    candidates.push(`${adData.imageUrl} ${adData.mediaWidth}w`);
+    return `srcset="${candidates.join(", ")}" sizes="(max-width: 680px) 100vw, 680px"`;
+  }
+
   renderLinkPreview(adData) {
     const urlDisplay = adData.captionText || this.extractDomain(adData.linkUrl);
 